@@ -3,17 +3,28 @@ Sistema de Acciones para Executor Agent.
 Implementa acciones desacopladas para cada tipo de decisión.
 """
 
+import asyncio
+import atexit
 import logging
-import json
+import os
+import threading
 import time
+import weakref
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Sequence, Union
 from dataclasses import dataclass
 from enum import Enum
 from email_service import EmailService, EmailResult
+from decision_engine import DecisionResult
+from json_utils import to_json
 
 logger = logging.getLogger(__name__)
 
+# Pool compartido para ejecutar acciones síncronas desde código asíncrono
+_ACTION_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="action")
+
 class ActionResult(Enum):
     """Resultados posibles de una acción."""
     SUCCESS = "SUCCESS"
@@ -21,7 +32,7 @@ class ActionResult(Enum):
     PARTIAL = "PARTIAL"
     SKIPPED = "SKIPPED"
 
-@dataclass
+@dataclass(slots=True)
 class ActionExecution:
     """Resultado de ejecución de una acción."""
     action_name: str
@@ -30,11 +41,246 @@ class ActionExecution:
     timestamp: float
     details: Optional[Dict[str, Any]] = None
 
+def _ok(action_name: str, message: str, timestamp: float,
+        details: Optional[Dict[str, Any]] = None) -> ActionExecution:
+    """Construir una ejecución exitosa."""
+    return ActionExecution(action_name, ActionResult.SUCCESS, message, timestamp, details)
+
+def _fail(action_name: str, message: str, timestamp: float,
+          details: Optional[Dict[str, Any]] = None) -> ActionExecution:
+    """Construir una ejecución fallida."""
+    return ActionExecution(action_name, ActionResult.FAILURE, message, timestamp, details)
+
+# Adjuntar el payload completo de cada acción en ActionExecution.details
+# (desactivado por defecto para no retener un dict grande por acción)
+_CAPTURE_DETAILS = os.getenv("AEGIS_CAPTURE_DETAILS", "false").lower() in ("1", "true")
+
+# Plantillas de mensajes de las acciones (se rellenan con format_map)
+_ALERT_QUEUED = "Alert email queued for {recipient_count} recipients"
+_TICKET_TITLE = "Incident: {event_type} on {resource}"
+_TICKET_DESCRIPTION = "Event detected with risk score {score:.2f}. Decision: {decision_str}"
+_TICKET_CREATED = "Ticket {ticket_id} created successfully"
+_SCRIPT_EXECUTED = "Script {script_name} executed on {resource}"
+_EVENT_LOGGED = "Event logged: {event_type} on {resource}"
+_EVENT_FLAGGED = "Event flagged for human review: {event_type}"
+
+def _event_view(event: Dict[str, Any], **extra: Any) -> Dict[str, Any]:
+    """Construir la vista de campos usada por las plantillas de mensajes."""
+    return dict(extra, event_type=event.get("event_type"), resource=event.get("resource"))
+
+def _decision_to_str(decision: Any) -> str:
+    """Normalizar una decisión (enum o texto) a su valor de texto."""
+    if isinstance(decision, Enum):
+        return decision.value
+    if decision is None:
+        return "UNKNOWN"
+    return str(decision)
+
+# Sinks activos, para poder vaciarlos todos ante errores o al terminar el proceso
+_SINKS: "weakref.WeakSet[BatchSink]" = weakref.WeakSet()
+
+def flush_all_sinks() -> None:
+    """Despachar de inmediato todas las emisiones pendientes en los sinks."""
+    for sink in list(_SINKS):
+        sink.flush()
+
+atexit.register(flush_all_sinks)
+
+# Estado del vaciado en segundo plano: como mucho un trabajo activo en el
+# pool, que repite el vaciado si llegan nuevas peticiones mientras corre
+_flush_lock = threading.Lock()
+_flush_scheduled = False
+_flush_requested = False
+
+def _run_scheduled_flush() -> None:
+    """Vaciar los sinks hasta que no queden peticiones pendientes."""
+    global _flush_scheduled, _flush_requested
+    while True:
+        with _flush_lock:
+            _flush_requested = False
+        flush_all_sinks()
+        with _flush_lock:
+            if not _flush_requested:
+                _flush_scheduled = False
+                return
+
+def _schedule_flush_all_sinks() -> None:
+    """
+    Programar un vaciado de todos los sinks en segundo plano.
+    
+    Las peticiones repetidas se agrupan en un único trabajo del pool. Si el
+    pool ya está cerrado (por ejemplo durante el apagado), el vaciado se hace
+    en línea.
+    """
+    global _flush_scheduled, _flush_requested
+    with _flush_lock:
+        _flush_requested = True
+        if _flush_scheduled:
+            return
+        _flush_scheduled = True
+    try:
+        _ACTION_POOL.submit(_run_scheduled_flush)
+    except RuntimeError:
+        with _flush_lock:
+            _flush_scheduled = False
+            _flush_requested = False
+        flush_all_sinks()
+
+class BatchSink(ABC):
+    """
+    Buffer de emisiones salientes que se despachan por lotes.
+    
+    Los elementos se acumulan hasta alcanzar batch_size o hasta que pasan
+    flush_interval_ms desde el primer elemento pendiente; entonces el lote
+    completo se despacha en segundo plano con una sola llamada a dispatch().
+    """
+    
+    def __init__(self, name: str, batch_size: int, flush_interval_ms: float):
+        self.name = name
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.logger = logging.getLogger(f"{__name__}.{name}")
+        self._buffer: List[Any] = []
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        _SINKS.add(self)
+    
+    def enqueue(self, item: Any) -> None:
+        """
+        Encolar un elemento para el próximo lote.
+        
+        Args:
+            item: Elemento a despachar
+        """
+        batch = None
+        with self._lock:
+            self._buffer.append(item)
+            if len(self._buffer) >= self.batch_size:
+                batch = self._take_batch()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        
+        if batch:
+            _ACTION_POOL.submit(self._dispatch_batch, batch)
+    
+    def flush(self) -> List[Any]:
+        """
+        Despachar de forma síncrona los elementos pendientes.
+        
+        Returns:
+            Resultados del despacho (vacío si no había pendientes)
+        """
+        with self._lock:
+            batch = self._take_batch()
+        if batch:
+            return self._dispatch_batch(batch)
+        return []
+    
+    def _take_batch(self) -> List[Any]:
+        """Extraer el buffer actual y cancelar el timer (requiere el lock)."""
+        batch, self._buffer = self._buffer, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+    
+    def _dispatch_batch(self, batch: List[Any]) -> List[Any]:
+        """Despachar un lote registrando cualquier error."""
+        try:
+            return self.dispatch(batch)
+        except Exception as e:
+            self.logger.error(f"Failed to dispatch batch of {len(batch)}: {str(e)}")
+            return []
+    
+    @abstractmethod
+    def dispatch(self, batch: List[Any]) -> List[Any]:
+        """
+        Enviar un lote de elementos al destino real.
+        
+        Args:
+            batch: Elementos acumulados
+            
+        Returns:
+            Resultado de cada elemento despachado de forma síncrona
+        """
+        pass
+
+class AlertSink(BatchSink):
+    """Sink que envía por correo las alertas acumuladas."""
+    
+    def __init__(self, get_email_service):
+        super().__init__(
+            "alert_sink",
+            batch_size=int(os.getenv("ALERT_BATCH_SIZE", "10")),
+            flush_interval_ms=float(os.getenv("ALERT_FLUSH_INTERVAL_MS", "200"))
+        )
+        self._get_email_service = get_email_service
+    
+    def dispatch(self, batch: List[Any]) -> List[EmailResult]:
+        """
+        Enviar cada alerta del lote con el servicio de correo.
+        
+        Returns:
+            Resultado de cada alerta enviada en este hilo; las entregadas a los
+            workers asíncronos no se incluyen
+        """
+        email_service = self._get_email_service()
+        if not email_service:
+            self.logger.error(f"📧 EMAIL FAILED: service not available, dropped {len(batch)} alerts")
+            now = time.time()
+            return [
+                EmailResult(
+                    success=False,
+                    message="Email service not available",
+                    recipients=recipients,
+                    timestamp=now,
+                    error_details="Email service not available - check configuration"
+                )
+                for recipients, _, _ in batch
+            ]
+        
+        # Con workers asíncronos activos (servidor MCP) el envío sale del hilo actual
+        pending = [
+            alert for alert in batch
+            if not email_service.submit_alert(*alert)
+        ]
+        if not pending:
+            return []
+        
+        # El resto se envía en una sola sesión SMTP (comandos en pipeline)
+        email_results = email_service.send_alerts(pending)
+        for (recipients, event, _), email_result in zip(pending, email_results):
+            if email_result.success:
+                self.logger.info("📧 EMAIL SENT: Alert for %s sent to %d recipients", event.get('event_type'), len(recipients))
+            else:
+                self.logger.error("📧 EMAIL FAILED: %s", email_result.message)
+        return email_results
+
+class TicketSink(BatchSink):
+    """Sink que registra los tickets acumulados en el sistema de tickets."""
+    
+    def __init__(self):
+        super().__init__(
+            "ticket_sink",
+            batch_size=int(os.getenv("TICKET_BATCH_SIZE", "10")),
+            flush_interval_ms=float(os.getenv("TICKET_FLUSH_INTERVAL_MS", "200"))
+        )
+    
+    def dispatch(self, batch: List[Any]) -> List[Any]:
+        """Simular la creación del lote de tickets."""
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("🎫 TICKETS CREATED (%d): %s", len(batch), to_json(batch))
+        return batch
+
 class Action(ABC):
     """
     Clase base abstracta para todas las acciones.
     """
     
+    __slots__ = ("name", "logger")
+    
     def __init__(self, name: str):
         self.name = name
         self.logger = logging.getLogger(f"{__name__}.{name}")
@@ -52,6 +298,40 @@ class Action(ABC):
         """
         pass
     
+    def flush(self) -> List[Any]:
+        """
+        Despachar emisiones pendientes (las acciones sin buffer no hacen nada).
+        
+        Returns:
+            Resultados del despacho síncrono
+        """
+        return []
+    
+    def _log_info(self, context: Dict[str, Any]) -> bool:
+        """Indicar si se deben emitir logs INFO (cacheado en el contexto por el ejecutor)."""
+        log_info = context.get("_log_info")
+        if log_info is None:
+            return self.logger.isEnabledFor(logging.INFO)
+        return log_info
+    
+    @staticmethod
+    def _capture_details(context: Dict[str, Any]) -> bool:
+        """Indicar si el resultado debe incluir el payload completo en details."""
+        return context.get("capture_details", _CAPTURE_DETAILS)
+    
+    @staticmethod
+    def _decision_str(context: Dict[str, Any]) -> str:
+        """Obtener la decisión como texto (precalculada por el ejecutor si existe)."""
+        decision_str = context.get("decision_str")
+        if decision_str is None:
+            return _decision_to_str(context.get("decision"))
+        return decision_str
+    
+    @staticmethod
+    def _now(context: Dict[str, Any]) -> float:
+        """Obtener el timestamp compartido del evento (o el actual si no existe)."""
+        return context.get("now") or time.time()
+    
     def validate_context(self, context: Dict[str, Any]) -> bool:
         """
         Validar que el contexto tenga los datos necesarios.
@@ -67,9 +347,25 @@ class Action(ABC):
 class SendAlertAction(Action):
     """Acción para enviar alertas por correo electrónico."""
     
-    def __init__(self):
+    __slots__ = ("email_service", "sink")
+    
+    def __init__(self, email_service: Optional[EmailService] = None):
+        """
+        Args:
+            email_service: Servicio de correo a reutilizar; si no se indica se crea al primer uso
+        """
         super().__init__("send_alert")
-        self.email_service = None
+        self.email_service = email_service
+        self.sink = AlertSink(self._get_email_service)
+    
+    def flush(self) -> List[EmailResult]:
+        """
+        Enviar las alertas pendientes en el sink.
+        
+        Returns:
+            Resultado de entrega de cada alerta enviada de forma síncrona
+        """
+        return self.sink.flush()
         
     def _get_email_service(self):
         """Obtener instancia del servicio de correo (lazy initialization)."""
@@ -89,7 +385,6 @@ class SendAlertAction(Action):
             return context["recipients"]
         
         # Obtener desde variables de entorno
-        import os
         recipients_str = os.getenv("ALERT_EMAIL_RECIPIENTS", "")
         if recipients_str:
             return [email.strip() for email in recipients_str.split(",") if email.strip()]
@@ -99,16 +394,17 @@ class SendAlertAction(Action):
     
     def execute(self, context: Dict[str, Any]) -> ActionExecution:
         """Enviar alerta por correo electrónico basada en el evento."""
+        now = self._now(context)
         try:
             event = context.get("event", {})
-            decision = context.get("decision", {})
+            decision_str = self._decision_str(context)
             score = context.get("score", 0)
             actions_executed = context.get("actions_executed", [])
             reasoning = context.get("reasoning", "")
             
             # Preparar datos para el correo
             decision_data = {
-                "decision": decision.value if hasattr(decision, 'value') else str(decision),
+                "decision": decision_str,
                 "score": score,
                 "actions_executed": actions_executed,
                 "reasoning": reasoning
@@ -117,125 +413,109 @@ class SendAlertAction(Action):
             # Obtener servicio de correo
             email_service = self._get_email_service()
             if not email_service:
-                return ActionExecution(
-                    action_name=self.name,
-                    result=ActionResult.FAILURE,
-                    message="Email service not available - check configuration",
-                    timestamp=time.time(),
-                    details={"error": "Email service initialization failed"}
+                return _fail(
+                    self.name,
+                    "Email service not available - check configuration",
+                    now,
+                    {"error": "Email service initialization failed"}
                 )
             
             # Obtener destinatarios
             recipients = self._get_recipients(context)
             if not recipients:
-                return ActionExecution(
-                    action_name=self.name,
-                    result=ActionResult.FAILURE,
-                    message="No email recipients configured",
-                    timestamp=time.time(),
-                    details={"error": "Empty recipient list"}
+                return _fail(
+                    self.name,
+                    "No email recipients configured",
+                    now,
+                    {"error": "Empty recipient list"}
                 )
             
-            # Enviar correo
-            email_result = email_service.send_alert(recipients, event, decision_data)
+            # Encolar correo; el sink lo envía por lotes en segundo plano
+            self.sink.enqueue((recipients, event, decision_data))
             
-            if email_result.success:
-                self.logger.info(f"� EMAIL SENT: Alert for {event.get('event_type')} sent to {len(recipients)} recipients")
-                return ActionExecution(
-                    action_name=self.name,
-                    result=ActionResult.SUCCESS,
-                    message=f"Alert email sent to {len(recipients)} recipients",
-                    timestamp=time.time(),
-                    details={
-                        "recipients": email_result.recipients,
-                        "email_result": "EMAIL_SENT"
-                    }
-                )
-            else:
-                self.logger.error(f"📧 EMAIL FAILED: {email_result.message}")
-                return ActionExecution(
-                    action_name=self.name,
-                    result=ActionResult.FAILURE,
-                    message=f"Email sending failed: {email_result.message}",
-                    timestamp=time.time(),
-                    details={
-                        "error": email_result.error_details,
-                        "recipients": recipients
-                    }
-                )
+            return _ok(
+                self.name,
+                _ALERT_QUEUED.format_map({"recipient_count": len(recipients)}),
+                now,
+                {
+                    "recipients": recipients,
+                    "email_result": "EMAIL_QUEUED"
+                } if self._capture_details(context) else None
+            )
                 
         except Exception as e:
             self.logger.error(f"Unexpected error in send_alert: {str(e)}")
-            return ActionExecution(
-                action_name=self.name,
-                result=ActionResult.FAILURE,
-                message=f"Unexpected error: {str(e)}",
-                timestamp=time.time()
-            )
+            return _fail(self.name, f"Unexpected error: {str(e)}", now)
 
 class CreateTicketAction(Action):
     """Acción para crear tickets de incidencia."""
     
+    __slots__ = ("sink",)
+    
     def __init__(self):
         super().__init__("create_ticket")
+        self.sink = TicketSink()
+    
+    def flush(self) -> List[Any]:
+        """Registrar los tickets pendientes en el sink."""
+        return self.sink.flush()
     
     def execute(self, context: Dict[str, Any]) -> ActionExecution:
         """Crear ticket basado en el evento."""
+        now = self._now(context)
         try:
             event = context.get("event", {})
-            decision = context.get("decision", {})
+            decision_str = self._decision_str(context)
             score = context.get("score", 0)
             
+            view = _event_view(event, score=score, decision_str=decision_str)
+            
             # Simular creación de ticket
             ticket_data = {
-                "ticket_id": f"TK-{int(time.time())}",
-                "title": f"Incident: {event.get('event_type')} on {event.get('resource')}",
-                "description": f"Event detected with risk score {score:.2f}. Decision: {decision.value if hasattr(decision, 'value') else str(decision)}",
+                "ticket_id": f"TK-{int(now)}",
+                "title": _TICKET_TITLE.format_map(view),
+                "description": _TICKET_DESCRIPTION.format_map(view),
                 "severity": event.get("severity", "UNKNOWN"),
                 "business_impact": event.get("business_impact", "UNKNOWN"),
                 "resource": event.get("resource", "UNKNOWN"),
                 "status": "OPEN",
-                "created_at": time.time(),
+                "created_at": now,
                 "priority": self._calculate_priority(score)
             }
             
-            # Simular llamada a sistema de tickets
-            self.logger.info(f"🎫 TICKET CREATED: {json.dumps(ticket_data, indent=2)}")
+            # Simular llamada a sistema de tickets (despachada por lotes)
+            self.sink.enqueue(ticket_data)
             
-            return ActionExecution(
-                action_name=self.name,
-                result=ActionResult.SUCCESS,
-                message=f"Ticket {ticket_data['ticket_id']} created successfully",
-                timestamp=time.time(),
-                details={"ticket_data": ticket_data}
+            return _ok(
+                self.name,
+                _TICKET_CREATED.format_map(ticket_data),
+                now,
+                {"ticket_data": ticket_data} if self._capture_details(context) else None
             )
             
         except Exception as e:
             self.logger.error(f"Failed to create ticket: {str(e)}")
-            return ActionExecution(
-                action_name=self.name,
-                result=ActionResult.FAILURE,
-                message=f"Ticket creation failed: {str(e)}",
-                timestamp=time.time()
-            )
+            return _fail(self.name, f"Ticket creation failed: {str(e)}", now)
+    
+    # Límites de score (inclusive) y prioridad de cada tramo
+    _PRIORITY_BOUNDS = (50, 80)
+    _PRIORITY_NAMES = ("MEDIUM", "HIGH", "CRITICAL")
     
     def _calculate_priority(self, score: float) -> str:
         """Calcular prioridad del ticket basada en score."""
-        if score >= 80:
-            return "CRITICAL"
-        elif score >= 50:
-            return "HIGH"
-        else:
-            return "MEDIUM"
+        return self._PRIORITY_NAMES[bisect_right(self._PRIORITY_BOUNDS, score)]
 
 class ExecuteScriptAction(Action):
     """Acción para ejecutar scripts de remediación."""
     
+    __slots__ = ()
+    
     def __init__(self):
         super().__init__("execute_script")
     
     def execute(self, context: Dict[str, Any]) -> ActionExecution:
         """Ejecutar script de remediación."""
+        now = self._now(context)
         try:
             event = context.get("event", {})
             
@@ -247,166 +527,164 @@ class ExecuteScriptAction(Action):
                     "severity": event.get("severity", "UNKNOWN"),
                     "confidence": event.get("confidence", 0.0)
                 },
-                "execution_id": f"EXEC-{int(time.time())}",
-                "started_at": time.time()
+                "execution_id": f"EXEC-{int(now)}",
+                "started_at": now
             }
             
             # Simular ejecución
-            self.logger.info(f"⚡ SCRIPT EXECUTED: {json.dumps(script_data, indent=2)}")
+            if self._log_info(context):
+                self.logger.info("⚡ SCRIPT EXECUTED: %s", to_json(script_data))
             
-            return ActionExecution(
-                action_name=self.name,
-                result=ActionResult.SUCCESS,
-                message=f"Script {script_data['script_name']} executed on {event.get('resource')}",
-                timestamp=time.time(),
-                details={"script_data": script_data}
+            return _ok(
+                self.name,
+                _SCRIPT_EXECUTED.format_map(_event_view(event, script_name=script_data["script_name"])),
+                now,
+                {"script_data": script_data} if self._capture_details(context) else None
             )
             
         except Exception as e:
             self.logger.error(f"Failed to execute script: {str(e)}")
-            return ActionExecution(
-                action_name=self.name,
-                result=ActionResult.FAILURE,
-                message=f"Script execution failed: {str(e)}",
-                timestamp=time.time()
-            )
+            return _fail(self.name, f"Script execution failed: {str(e)}", now)
 
 class LogEventAction(Action):
     """Acción para registrar eventos."""
     
+    __slots__ = ()
+    
     def __init__(self):
         super().__init__("log_event")
     
     def execute(self, context: Dict[str, Any]) -> ActionExecution:
         """Registrar evento en logs."""
+        now = self._now(context)
         try:
             event = context.get("event", {})
-            decision = context.get("decision", {})
+            decision_str = self._decision_str(context)
             score = context.get("score", 0)
             
             log_entry = {
-                "timestamp": time.time(),
+                "timestamp": now,
                 "event_type": event.get("event_type", "UNKNOWN"),
                 "resource": event.get("resource", "UNKNOWN"),
                 "severity": event.get("severity", "UNKNOWN"),
                 "business_impact": event.get("business_impact", "UNKNOWN"),
-                "decision": decision.value if hasattr(decision, 'value') else str(decision),
+                "decision": decision_str,
                 "risk_score": score,
                 "confidence": event.get("confidence", 0.0)
             }
             
-            self.logger.info(f"📋 EVENT LOGGED: {json.dumps(log_entry, indent=2)}")
+            if self._log_info(context):
+                self.logger.info("📋 EVENT LOGGED: %s", to_json(log_entry))
             
-            return ActionExecution(
-                action_name=self.name,
-                result=ActionResult.SUCCESS,
-                message=f"Event logged: {event.get('event_type')} on {event.get('resource')}",
-                timestamp=time.time(),
-                details={"log_entry": log_entry}
+            return _ok(
+                self.name,
+                _EVENT_LOGGED.format_map(_event_view(event)),
+                now,
+                {"log_entry": log_entry} if self._capture_details(context) else None
             )
             
         except Exception as e:
             self.logger.error(f"Failed to log event: {str(e)}")
-            return ActionExecution(
-                action_name=self.name,
-                result=ActionResult.FAILURE,
-                message=f"Event logging failed: {str(e)}",
-                timestamp=time.time()
-            )
+            return _fail(self.name, f"Event logging failed: {str(e)}", now)
 
 class FlagForReviewAction(Action):
     """Acción para marcar eventos para revisión humana."""
     
+    __slots__ = ()
+    
     def __init__(self):
         super().__init__("flag_for_review")
     
     def execute(self, context: Dict[str, Any]) -> ActionExecution:
         """Marcar evento para revisión humana."""
+        now = self._now(context)
         try:
             event = context.get("event", {})
-            decision = context.get("decision", {})
+            decision_str = self._decision_str(context)
             score = context.get("score", 0)
             
             review_data = {
-                "review_id": f"RV-{int(time.time())}",
+                "review_id": f"RV-{int(now)}",
                 "event_type": event.get("event_type", "UNKNOWN"),
                 "resource": event.get("resource", "UNKNOWN"),
                 "reason": "Low confidence",
                 "confidence": event.get("confidence", 0.0),
                 "risk_score": score,
-                "decision": decision.value if hasattr(decision, 'value') else str(decision),
+                "decision": decision_str,
                 "status": "PENDING_REVIEW",
-                "created_at": time.time()
+                "created_at": now
             }
             
-            self.logger.info(f"👁️ FLAGGED FOR REVIEW: {json.dumps(review_data, indent=2)}")
+            if self._log_info(context):
+                self.logger.info("👁️ FLAGGED FOR REVIEW: %s", to_json(review_data))
             
-            return ActionExecution(
-                action_name=self.name,
-                result=ActionResult.SUCCESS,
-                message=f"Event flagged for human review: {event.get('event_type')}",
-                timestamp=time.time(),
-                details={"review_data": review_data}
+            return _ok(
+                self.name,
+                _EVENT_FLAGGED.format_map(_event_view(event)),
+                now,
+                {"review_data": review_data} if self._capture_details(context) else None
             )
             
         except Exception as e:
             self.logger.error(f"Failed to flag for review: {str(e)}")
-            return ActionExecution(
-                action_name=self.name,
-                result=ActionResult.FAILURE,
-                message=f"Review flagging failed: {str(e)}",
-                timestamp=time.time()
-            )
+            return _fail(self.name, f"Review flagging failed: {str(e)}", now)
 
 class LogErrorAction(Action):
     """Acción para registrar errores."""
     
+    __slots__ = ()
+    
     def __init__(self):
         super().__init__("log_error")
     
     def execute(self, context: Dict[str, Any]) -> ActionExecution:
         """Registrar error en logs."""
+        now = self._now(context)
         try:
             error_message = context.get("error", "Unknown error")
             event_data = context.get("event", {})
             
             error_entry = {
-                "timestamp": time.time(),
+                "timestamp": now,
                 "error_type": "PROCESSING_ERROR",
                 "message": error_message,
                 "event_data": event_data,
                 "severity": "HIGH"
             }
             
-            self.logger.error(f"❌ ERROR LOGGED: {json.dumps(error_entry, indent=2)}")
+            if self.logger.isEnabledFor(logging.ERROR):
+                self.logger.error("❌ ERROR LOGGED: %s", to_json(error_entry))
             
-            return ActionExecution(
-                action_name=self.name,
-                result=ActionResult.SUCCESS,
-                message=f"Error logged: {error_message}",
-                timestamp=time.time(),
-                details={"error_entry": error_entry}
+            # Un error no debe dejar alertas ni tickets retenidos en buffer; el
+            # vaciado se hace en segundo plano para no bloquear esta petición
+            _schedule_flush_all_sinks()
+            
+            return _ok(
+                self.name,
+                f"Error logged: {error_message}",
+                now,
+                {"error_entry": error_entry} if self._capture_details(context) else None
             )
             
         except Exception as e:
             self.logger.error(f"Failed to log error: {str(e)}")
-            return ActionExecution(
-                action_name=self.name,
-                result=ActionResult.FAILURE,
-                message=f"Error logging failed: {str(e)}",
-                timestamp=time.time()
-            )
+            return _fail(self.name, f"Error logging failed: {str(e)}", now)
 
 class ActionExecutor:
     """
     Ejecutor de acciones que coordina la ejecución de múltiples acciones.
     """
     
-    def __init__(self):
-        """Inicializar el ejecutor con todas las acciones disponibles."""
+    def __init__(self, email_service: Optional[EmailService] = None):
+        """
+        Inicializar el ejecutor con todas las acciones disponibles.
+        
+        Args:
+            email_service: Servicio de correo compartido para SendAlertAction (opcional)
+        """
         self.logger = logging.getLogger(f"{__name__}.ActionExecutor")
         self.actions: Dict[str, Action] = {
-            "send_alert": SendAlertAction(),
+            "send_alert": SendAlertAction(email_service),
             "create_ticket": CreateTicketAction(),
             "execute_script": ExecuteScriptAction(),
             "log_event": LogEventAction(),
@@ -414,50 +692,162 @@ class ActionExecutor:
             "log_error": LogErrorAction()
         }
     
-    def execute_actions(self, action_names: List[str], context: Dict[str, Any]) -> List[ActionExecution]:
+    def execute_actions(self,
+                        action_names: Sequence[str],
+                        context: Union[Dict[str, Any], DecisionResult],
+                        event: Optional[Dict[str, Any]] = None) -> List[ActionExecution]:
         """
         Ejecutar una lista de acciones en orden.
         
         Args:
             action_names: Nombres de acciones a ejecutar
-            context: Contexto de ejecución
+            context: Contexto de ejecución, o directamente el DecisionResult del evento
+            event: Datos del evento cuando context es un DecisionResult
             
         Returns:
             Lista de resultados de ejecución
         """
-        results = []
+        context = self._prepare_context(context, event)
+        now = context["now"]
         
-        for action_name in action_names:
-            action = self.actions.get(action_name)
-            if not action:
-                self.logger.warning(f"Action '{action_name}' not found, skipping")
-                results.append(ActionExecution(
-                    action_name=action_name,
-                    result=ActionResult.SKIPPED,
-                    message=f"Action '{action_name}' not found",
-                    timestamp=time.time()
-                ))
-                continue
+        # Referencias locales para evitar las búsquedas de atributo por acción
+        execute_action = self._execute_action
+        actions_get = self.actions.get
+        log = self.logger
+        return [
+            execute_action(action_name, actions_get(action_name), context, now, log)
+            for action_name in action_names
+        ]
+    
+    async def execute_actions_async(self,
+                                    action_names: Sequence[str],
+                                    context: Union[Dict[str, Any], DecisionResult],
+                                    event: Optional[Dict[str, Any]] = None) -> List[ActionExecution]:
+        """
+        Ejecutar una lista de acciones de forma concurrente.
+        
+        Las acciones son independientes entre sí, por lo que se ejecutan en
+        el pool de hilos compartido y se esperan con asyncio.gather; los
+        resultados conservan el orden de action_names.
+        
+        Args:
+            action_names: Nombres de acciones a ejecutar
+            context: Contexto de ejecución, o directamente el DecisionResult del evento
+            event: Datos del evento cuando context es un DecisionResult
             
-            try:
-                self.logger.info(f"Executing action: {action_name}")
-                result = action.execute(context)
-                results.append(result)
-                
-                if result.result == ActionResult.FAILURE:
-                    self.logger.warning(f"Action '{action_name}' failed: {result.message}")
-                
-            except Exception as e:
-                self.logger.error(f"Unexpected error executing '{action_name}': {str(e)}")
-                results.append(ActionExecution(
-                    action_name=action_name,
-                    result=ActionResult.FAILURE,
-                    message=f"Unexpected error: {str(e)}",
-                    timestamp=time.time()
-                ))
+        Returns:
+            Lista de resultados de ejecución
+        """
+        context = self._prepare_context(context, event)
+        now = context["now"]
+        
+        loop = asyncio.get_running_loop()
+        execute_action = self._execute_action
+        actions_get = self.actions.get
+        log = self.logger
+        outcomes = await asyncio.gather(
+            *(
+                loop.run_in_executor(_ACTION_POOL, execute_action, action_name,
+                                     actions_get(action_name), context, now, log)
+                for action_name in action_names
+            ),
+            return_exceptions=True
+        )
         
+        results = []
+        for action_name, outcome in zip(action_names, outcomes):
+            if isinstance(outcome, BaseException):
+                log.error(f"Unexpected error executing '{action_name}': {str(outcome)}")
+                outcome = _fail(action_name, f"Unexpected error: {str(outcome)}", now)
+            results.append(outcome)
         return results
     
+    def _prepare_context(self,
+                         context: Union[Dict[str, Any], DecisionResult],
+                         event: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Copiar el contexto añadiendo los valores compartidos por sus acciones.
+        
+        Se agregan un timestamp único para el evento ("now"), la decisión
+        normalizada a texto ("decision_str"), si se capturan los details
+        ("capture_details") y si el nivel INFO está habilitado ("_log_info"),
+        evaluados una sola vez por lote. Si se recibe un DecisionResult, el
+        contexto se construye directamente desde sus campos.
+        
+        Args:
+            context: Contexto recibido o DecisionResult
+            event: Datos del evento cuando context es un DecisionResult
+            
+        Returns:
+            Contexto preparado para las acciones
+        """
+        if not isinstance(context, dict):
+            return {
+                "event": event if event is not None else {},
+                "decision": context.decision,
+                "score": context.score,
+                "reasoning": context.reasoning,
+                "actions_executed": context.actions_executed,
+                "now": context.timestamp or time.time(),
+                "decision_str": _decision_to_str(context.decision),
+                "capture_details": _CAPTURE_DETAILS,
+                "_log_info": self.logger.isEnabledFor(logging.INFO)
+            }
+        
+        return dict(
+            context,
+            now=context.get("now") or time.time(),
+            decision_str=_decision_to_str(context.get("decision")),
+            capture_details=context.get("capture_details", _CAPTURE_DETAILS),
+            _log_info=self.logger.isEnabledFor(logging.INFO)
+        )
+    
+    @staticmethod
+    def _execute_action(action_name: str,
+                        action: Optional[Action],
+                        context: Dict[str, Any],
+                        now: float,
+                        log: logging.Logger) -> ActionExecution:
+        """
+        Ejecutar una acción individual capturando sus errores.
+        
+        Args:
+            action_name: Nombre de la acción
+            action: Acción registrada con ese nombre, o None si no existe
+            context: Contexto de ejecución
+            now: Timestamp compartido del evento
+            log: Logger del ejecutor
+            
+        Returns:
+            Resultado de la ejecución
+        """
+        if action is None:
+            log.warning(f"Action '{action_name}' not found, skipping")
+            return ActionExecution(
+                action_name=action_name,
+                result=ActionResult.SKIPPED,
+                message=f"Action '{action_name}' not found",
+                timestamp=now
+            )
+        
+        try:
+            if context["_log_info"]:
+                log.info("Executing action: %s", action_name)
+            result = action.execute(context)
+            
+            if result.result is ActionResult.FAILURE:
+                log.warning(f"Action '{action_name}' failed: {result.message}")
+            return result
+            
+        except Exception as e:
+            log.error(f"Unexpected error executing '{action_name}': {str(e)}")
+            return _fail(action_name, f"Unexpected error: {str(e)}", now)
+    
+    def flush(self) -> None:
+        """Despachar las emisiones pendientes de todas las acciones."""
+        for action in self.actions.values():
+            action.flush()
+    
     def get_available_actions(self) -> List[str]:
         """
         Obtener lista de acciones disponibles.
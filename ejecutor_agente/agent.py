@@ -12,10 +12,11 @@ from google.adk.tools.mcp_tool import MCPToolset, StreamableHTTPConnectionParams
 from a2a.types import AgentSkill, AgentCard, AgentCapabilities
 from decision_engine import DecisionEngine, Event, DecisionResult
 from action_system import ActionExecutor
+from logging_setup import setup_queue_logging
 from executor_tools import initialize_tools, process_event, get_decision_history, calculate_risk_score, get_available_actions, get_decision_thresholds
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(format="[%(levelname)s]: %(message)s", level=logging.INFO)
+setup_queue_logging(logging.INFO, "[%(levelname)s]: %(message)s")
 
 # A2A configuration
 host = os.getenv("A2A_HOST", "localhost")
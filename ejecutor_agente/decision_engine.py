@@ -4,8 +4,13 @@ Motor de decisión autónomo basado en score de riesgo.
 """
 
 import logging
+import os
+from bisect import bisect_left
+from collections import deque
 from enum import Enum
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from dataclasses import dataclass
 import time
 
@@ -30,6 +35,10 @@ class BusinessImpact(Enum):
     MEDIUM = "MEDIUM"
     CRITICAL = "CRITICAL"
 
+# Búsqueda directa de miembros por valor (evita Enum.__call__ por evento)
+_SEV_BY_NAME: Dict[str, Severity] = {s.value: s for s in Severity}
+_IMP_BY_NAME: Dict[str, BusinessImpact] = {i.value: i for i in BusinessImpact}
+
 @dataclass
 class Event:
     """Estructura de eventos recibidos por el executor_agent."""
@@ -40,16 +49,110 @@ class Event:
     business_impact: BusinessImpact
     confidence: float  # 0.0 a 1.0
 
-@dataclass
+@dataclass(slots=True)
 class DecisionResult:
     """Resultado estructurado de una decisión."""
     decision: DecisionType
     score: float
-    actions_executed: List[str]
+    actions_executed: Sequence[str]
     status: str
     reasoning: str
     timestamp: float
 
+def _to_float(value: Any) -> Tuple[Optional[float], Optional[str]]:
+    """
+    Convertir un valor numérico del evento a float.
+    
+    Args:
+        value: Valor leído del evento
+        
+    Returns:
+        Tupla (valor, None) o (None, motivo del error)
+    """
+    try:
+        return float(value), None
+    except (TypeError, ValueError) as e:
+        return None, str(e)
+
+# Códigos de decisión producidos por _score_kernel
+_DECISION_CODES = (
+    DecisionType.EXECUTE_IMMEDIATE,
+    DecisionType.ALERT_AND_TICKET,
+    DecisionType.LOG_ONLY,
+    DecisionType.REQUIRES_HUMAN_REVIEW
+)
+
+def _score_kernel(base_scores: List[float],
+                  confidences: List[float],
+                  immediate_threshold: float,
+                  alert_threshold: float,
+                  confidence_threshold: float) -> Tuple[List[float], List[int]]:
+    """
+    Calcular scores y códigos de decisión sobre columnas numéricas planas.
+    
+    Solo opera sobre números (sin enums ni diccionarios) para mantener el
+    bucle caliente mínimo.
+    
+    Args:
+        base_scores: Suma de pesos de severidad, impacto y urgencia por evento
+        confidences: Confianza por evento
+        immediate_threshold: Umbral de ejecución inmediata
+        alert_threshold: Umbral de alerta y ticket
+        confidence_threshold: Confianza mínima para decidir autónomamente
+        
+    Returns:
+        Tupla (scores, códigos de decisión) indexables en _DECISION_CODES
+    """
+    scores = []
+    codes = []
+    append_score = scores.append
+    append_code = codes.append
+    for base, confidence in zip(base_scores, confidences):
+        score = max(0, min(100, base * confidence))
+        append_score(score)
+        if confidence < confidence_threshold:
+            append_code(3)
+        elif score >= immediate_threshold:
+            append_code(0)
+        elif score >= alert_threshold:
+            append_code(1)
+        else:
+            append_code(2)
+    return scores, codes
+
+@lru_cache(maxsize=256)
+def _reasoning_template(decision: DecisionType,
+                        severity: Severity,
+                        business_impact: BusinessImpact,
+                        immediate_threshold: float,
+                        alert_threshold: float) -> str:
+    """
+    Construir la plantilla de razonamiento para una combinación estática.
+    
+    Las partes fijas (severidad, impacto, decisión y umbrales) se resuelven una
+    sola vez; los campos por evento quedan como marcadores para str.format.
+    
+    Returns:
+        Plantilla con marcadores event_type, resource, time_to_impact,
+        confidence y score
+    """
+    if decision == DecisionType.REQUIRES_HUMAN_REVIEW:
+        tail = "Low confidence triggered human review requirement"
+    elif decision == DecisionType.EXECUTE_IMMEDIATE:
+        tail = f"High score ({{score:.2f}} >= {immediate_threshold}) requires immediate execution"
+    elif decision == DecisionType.ALERT_AND_TICKET:
+        tail = f"Medium score ({{score:.2f}} >= {alert_threshold}) requires alert and ticket"
+    else:
+        tail = f"Low score ({{score:.2f}} < {alert_threshold}) only requires logging"
+        
+    return " | ".join((
+        "Event: {event_type} on {resource}",
+        f"Severity: {severity.value}, Impact: {business_impact.value}",
+        "Time to impact: {time_to_impact}min, Confidence: {confidence:.2f}",
+        "Risk score: {score:.2f}",
+        tail
+    ))
+
 class DecisionEngine:
     """
     Motor de decisión desacoplado que calcula scores de riesgo
@@ -76,10 +179,43 @@ class DecisionEngine:
     
     URGENCY_WEIGHT = 20  # Peso máximo para urgencia
     
+    # Tramos de urgencia: límites superiores en minutos (inclusive) y el
+    # puntaje correspondiente; más allá del último límite aplica el 10%
+    _URGENCY_BOUNDS = (5, 30, 120)
+    _URGENCY_SCORES = (
+        URGENCY_WEIGHT,
+        URGENCY_WEIGHT * 0.7,
+        URGENCY_WEIGHT * 0.4,
+        URGENCY_WEIGHT * 0.1
+    )
+    
+    # Acciones por decisión (tuplas inmutables compartidas entre eventos)
+    _ACTION_MAP: Dict[DecisionType, Tuple[str, ...]] = {
+        DecisionType.EXECUTE_IMMEDIATE: (
+            "send_alert",
+            "create_ticket",
+            "execute_script"
+        ),
+        DecisionType.ALERT_AND_TICKET: (
+            "send_alert",
+            "create_ticket"
+        ),
+        DecisionType.LOG_ONLY: (
+            "log_event",
+        ),
+        DecisionType.REQUIRES_HUMAN_REVIEW: (
+            "log_event",
+            "flag_for_review"
+        )
+    }
+    
     def __init__(self):
         """Inicializar el motor de decisión."""
         self.logger = logging.getLogger(f"{__name__}.DecisionEngine")
-        self.decision_history: List[DecisionResult] = []
+        # Historial acotado: las decisiones más antiguas se descartan al llenarse
+        self.decision_history: deque = deque(
+            maxlen=int(os.getenv("DECISION_HISTORY_MAX", "10000"))
+        )
         
     def calculate_risk_score(self, event: Event) -> float:
         """
@@ -98,15 +234,10 @@ class DecisionEngine:
         impact_score = self.IMPACT_WEIGHTS[event.business_impact]
         
         # Puntaje de urgencia basado en tiempo hasta impacto
-        # Menos tiempo = más urgente
-        if event.time_to_impact <= 5:  # 5 minutos o menos
-            urgency_score = self.URGENCY_WEIGHT
-        elif event.time_to_impact <= 30:  # 30 minutos
-            urgency_score = self.URGENCY_WEIGHT * 0.7
-        elif event.time_to_impact <= 120:  # 2 horas
-            urgency_score = self.URGENCY_WEIGHT * 0.4
-        else:  # más de 2 horas
-            urgency_score = self.URGENCY_WEIGHT * 0.1
+        # Menos tiempo = más urgente (5 min, 30 min, 2 horas, más)
+        urgency_score = self._URGENCY_SCORES[
+            bisect_left(self._URGENCY_BOUNDS, event.time_to_impact)
+        ]
             
         # Calcular score total (normalizado a 0-100)
         total_score = severity_score + impact_score + urgency_score
@@ -117,15 +248,16 @@ class DecisionEngine:
         # Asegurar que esté en rango 0-100
         final_score = max(0, min(100, adjusted_score))
         
-        self.logger.info(
-            f"Score calculation - Severity: {severity_score}, "
-            f"Impact: {impact_score}, Urgency: {urgency_score}, "
-            f"Confidence: {event.confidence}, Final: {final_score:.2f}"
-        )
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                f"Score calculation - Severity: {severity_score}, "
+                f"Impact: {impact_score}, Urgency: {urgency_score}, "
+                f"Confidence: {event.confidence}, Final: {final_score:.2f}"
+            )
         
         return final_score
     
-    def make_decision(self, event: Event) -> DecisionType:
+    def make_decision(self, event: Event) -> Tuple[DecisionType, float]:
         """
         Tomar decisión basada en el score y confianza.
         
@@ -133,14 +265,14 @@ class DecisionEngine:
             event: Evento a evaluar
             
         Returns:
-            Tipo de decisión a tomar
+            Tupla (tipo de decisión a tomar, score de riesgo calculado)
         """
         # Verificar confianza primero
         if event.confidence < self.CONFIDENCE_THRESHOLD:
             self.logger.warning(
                 f"Low confidence ({event.confidence:.2f}) requires human review"
             )
-            return DecisionType.REQUIRES_HUMAN_REVIEW
+            return DecisionType.REQUIRES_HUMAN_REVIEW, self.calculate_risk_score(event)
         
         # Calcular score de riesgo
         score = self.calculate_risk_score(event)
@@ -153,10 +285,10 @@ class DecisionEngine:
         else:
             decision = DecisionType.LOG_ONLY
             
-        self.logger.info(f"Decision made: {decision.value} (score: {score:.2f})")
-        return decision
+        self.logger.info("Decision made: %s (score: %.2f)", decision.value, score)
+        return decision, score
     
-    def get_actions_for_decision(self, decision: DecisionType) -> List[str]:
+    def get_actions_for_decision(self, decision: DecisionType) -> Tuple[str, ...]:
         """
         Mapear decisión a acciones específicas.
         
@@ -164,28 +296,9 @@ class DecisionEngine:
             decision: Tipo de decisión
             
         Returns:
-            Lista de acciones a ejecutar
+            Tupla de acciones a ejecutar
         """
-        action_map = {
-            DecisionType.EXECUTE_IMMEDIATE: [
-                "send_alert",
-                "create_ticket", 
-                "execute_script"
-            ],
-            DecisionType.ALERT_AND_TICKET: [
-                "send_alert",
-                "create_ticket"
-            ],
-            DecisionType.LOG_ONLY: [
-                "log_event"
-            ],
-            DecisionType.REQUIRES_HUMAN_REVIEW: [
-                "log_event",
-                "flag_for_review"
-            ]
-        }
-        
-        return action_map.get(decision, [])
+        return self._ACTION_MAP.get(decision, ())
     
     def generate_reasoning(self, event: Event, score: float, decision: DecisionType) -> str:
         """
@@ -199,23 +312,109 @@ class DecisionEngine:
         Returns:
             Explicación en texto plano
         """
-        reasoning_parts = [
-            f"Event: {event.event_type} on {event.resource}",
-            f"Severity: {event.severity.value}, Impact: {event.business_impact.value}",
-            f"Time to impact: {event.time_to_impact}min, Confidence: {event.confidence:.2f}",
-            f"Risk score: {score:.2f}"
-        ]
+        template = _reasoning_template(
+            decision,
+            event.severity,
+            event.business_impact,
+            self.IMMEDIATE_THRESHOLD,
+            self.ALERT_THRESHOLD
+        )
+        return template.format(
+            event_type=event.event_type,
+            resource=event.resource,
+            time_to_impact=event.time_to_impact,
+            confidence=event.confidence,
+            score=score
+        )
+    
+    @staticmethod
+    def _parse_event(event_data: Dict[str, Any]) -> Tuple[Optional[Event], Optional[str], Optional[str]]:
+        """
+        Validar y construir un Event sin usar excepciones para los casos comunes.
         
-        if decision == DecisionType.REQUIRES_HUMAN_REVIEW:
-            reasoning_parts.append("Low confidence triggered human review requirement")
-        elif decision == DecisionType.EXECUTE_IMMEDIATE:
-            reasoning_parts.append(f"High score ({score:.2f} >= {self.IMMEDIATE_THRESHOLD}) requires immediate execution")
-        elif decision == DecisionType.ALERT_AND_TICKET:
-            reasoning_parts.append(f"Medium score ({score:.2f} >= {self.ALERT_THRESHOLD}) requires alert and ticket")
-        else:
-            reasoning_parts.append(f"Low score ({score:.2f} < {self.ALERT_THRESHOLD}) only requires logging")
+        Los campos se revisan en el mismo orden en que se leen, de modo que el
+        primer problema encontrado es el que se reporta. Un campo ausente y un
+        valor inválido se reportan por separado para que los llamadores puedan
+        distinguirlos sin interpretar el mensaje.
+        
+        Args:
+            event_data: Diccionario con datos del evento
             
-        return " | ".join(reasoning_parts)
+        Returns:
+            Tupla (evento, None, None) si es válido, (None, campo faltante, None)
+            si falta un campo requerido, o (None, None, motivo) si un valor no
+            es válido
+        """
+        if not isinstance(event_data, dict):
+            return None, None, f"Event data must be an object, got {type(event_data).__name__}"
+        
+        missing = object()
+        
+        event_type = event_data.get("event_type", missing)
+        if event_type is missing:
+            return None, "event_type", None
+        
+        severity = event_data.get("severity", missing)
+        if severity is missing:
+            return None, "severity", None
+        severity = _SEV_BY_NAME.get(severity) if isinstance(severity, str) else None
+        if severity is None:
+            return None, None, f"{event_data['severity']!r} is not a valid Severity"
+        
+        resource = event_data.get("resource", missing)
+        if resource is missing:
+            return None, "resource", None
+        
+        time_to_impact = event_data.get("time_to_impact", missing)
+        if time_to_impact is missing:
+            return None, "time_to_impact", None
+        time_to_impact, error = _to_float(time_to_impact)
+        if error:
+            return None, None, error
+        
+        business_impact = event_data.get("business_impact", missing)
+        if business_impact is missing:
+            return None, "business_impact", None
+        business_impact = _IMP_BY_NAME.get(business_impact) if isinstance(business_impact, str) else None
+        if business_impact is None:
+            return None, None, f"{event_data['business_impact']!r} is not a valid BusinessImpact"
+        
+        confidence = event_data.get("confidence", missing)
+        if confidence is missing:
+            return None, "confidence", None
+        confidence, error = _to_float(confidence)
+        if error:
+            return None, None, error
+        
+        return Event(
+            event_type=event_type,
+            severity=severity,
+            resource=resource,
+            time_to_impact=time_to_impact,
+            business_impact=business_impact,
+            confidence=confidence
+        ), None, None
+    
+    def _error_result(self, reason: str, timestamp: float) -> DecisionResult:
+        """
+        Registrar y construir el resultado de un evento que no pudo procesarse.
+        
+        Args:
+            reason: Motivo del error
+            timestamp: Timestamp del procesamiento
+            
+        Returns:
+            Resultado de error (LOG_ONLY con log_error)
+        """
+        self.logger.error(f"Error processing event: {reason}")
+        return DecisionResult(
+            decision=DecisionType.LOG_ONLY,
+            score=0.0,
+            actions_executed=["log_error"],
+            status="error",
+            reasoning=f"Processing error: {reason}",
+            timestamp=timestamp
+        )
     
     def process_event(self, event_data: Dict[str, Any]) -> DecisionResult:
         """
@@ -227,54 +426,107 @@ class DecisionEngine:
         Returns:
             Resultado estructurado de la decisión
         """
-        try:
-            # Parsear evento
-            event = Event(
-                event_type=event_data["event_type"],
-                severity=Severity(event_data["severity"]),
-                resource=event_data["resource"],
-                time_to_impact=float(event_data["time_to_impact"]),
-                business_impact=BusinessImpact(event_data["business_impact"]),
-                confidence=float(event_data["confidence"])
-            )
-            
-            # Tomar decisión
-            decision = self.make_decision(event)
-            score = self.calculate_risk_score(event)
-            
-            # Obtener acciones
-            actions = self.get_actions_for_decision(decision)
-            
-            # Generar explicación
-            reasoning = self.generate_reasoning(event, score, decision)
+        now = time.time()
+        
+        # Parsear evento
+        event, missing_field, error = self._parse_event(event_data)
+        if event is None:
+            return self._error_result(error if missing_field is None else repr(missing_field), now)
+        
+        # Tomar decisión
+        decision, score = self.make_decision(event)
+        
+        # Obtener acciones
+        actions = self.get_actions_for_decision(decision)
+        
+        # Generar explicación
+        reasoning = self.generate_reasoning(event, score, decision)
+        
+        # Crear resultado
+        result = DecisionResult(
+            decision=decision,
+            score=score,
+            actions_executed=actions,
+            status="completed",
+            reasoning=reasoning,
+            timestamp=now
+        )
+        
+        # Guardar en historial
+        self.decision_history.append(result)
+        
+        self.logger.info("Event processed successfully: %s", event.event_type)
+        return result
+    
+    def process_events(self, events_data: List[Dict[str, Any]]) -> List[DecisionResult]:
+        """
+        Procesar un lote de eventos y retornar sus resultados en el mismo orden.
+        
+        Los eventos válidos se parsean a columnas planas (pesos de severidad,
+        impacto, urgencia y confianza) y el score y la decisión se calculan en
+        una sola pasada sobre ellas, sin el logging por evento de process_event.
+        Los eventos inválidos producen un resultado de error en su posición.
+        
+        Args:
+            events_data: Lista de diccionarios con datos de eventos
             
-            # Crear resultado
-            result = DecisionResult(
+        Returns:
+            Lista de resultados estructurados de decisión
+        """
+        now = time.time()
+        results: List[Optional[DecisionResult]] = [None] * len(events_data)
+        
+        # Parsear eventos válidos a columnas
+        events: List[Event] = []
+        positions: List[int] = []
+        for i, event_data in enumerate(events_data):
+            event, missing_field, error = self._parse_event(event_data)
+            if event is None:
+                results[i] = self._error_result(error if missing_field is None else repr(missing_field), now)
+                continue
+            events.append(event)
+            positions.append(i)
+        
+        severity_weights = self.SEVERITY_WEIGHTS
+        impact_weights = self.IMPACT_WEIGHTS
+        urgency_bounds = self._URGENCY_BOUNDS
+        urgency_scores = self._URGENCY_SCORES
+        
+        base_scores = [
+            severity_weights[e.severity]
+            + impact_weights[e.business_impact]
+            + urgency_scores[bisect_left(urgency_bounds, e.time_to_impact)]
+            for e in events
+        ]
+        confidences = [e.confidence for e in events]
+        
+        # Scores y decisiones (la confianza baja tiene prioridad)
+        scores, codes = _score_kernel(
+            base_scores,
+            confidences,
+            self.IMMEDIATE_THRESHOLD,
+            self.ALERT_THRESHOLD,
+            self.CONFIDENCE_THRESHOLD
+        )
+        decisions = [_DECISION_CODES[code] for code in codes]
+        
+        for i, event, score, decision in zip(positions, events, scores, decisions):
+            results[i] = DecisionResult(
                 decision=decision,
                 score=score,
-                actions_executed=actions,
+                actions_executed=self.get_actions_for_decision(decision),
                 status="completed",
-                reasoning=reasoning,
-                timestamp=time.time()
-            )
-            
-            # Guardar en historial
-            self.decision_history.append(result)
-            
-            self.logger.info(f"Event processed successfully: {event.event_type}")
-            return result
-            
-        except Exception as e:
-            self.logger.error(f"Error processing event: {str(e)}")
-            # Retornar resultado de error
-            return DecisionResult(
-                decision=DecisionType.LOG_ONLY,
-                score=0.0,
-                actions_executed=["log_error"],
-                status="error",
-                reasoning=f"Processing error: {str(e)}",
-                timestamp=time.time()
+                reasoning=self.generate_reasoning(event, score, decision),
+                timestamp=now
             )
+        
+        # Guardar en historial
+        self.decision_history.extend(results[i] for i in positions)
+        
+        self.logger.info(
+            "Batch processed: %d/%d events completed", len(positions), len(events_data)
+        )
+        return results
     
     def get_decision_history(self, limit: int = 10) -> List[DecisionResult]:
         """
@@ -286,4 +538,27 @@ class DecisionEngine:
         Returns:
             Lista de decisiones recientes
         """
-        return self.decision_history[-limit:]
+        recent = list(islice(reversed(self.decision_history), max(limit, 0)))
+        recent.reverse()
+        return recent
+
+def parse_event(event_data: Dict[str, Any]) -> Event:
+    """
+    Validar y construir un Event con las mismas reglas que DecisionEngine.
+    
+    Args:
+        event_data: Diccionario con datos del evento
+        
+    Returns:
+        Evento validado
+        
+    Raises:
+        KeyError: Si falta un campo requerido
+        ValueError: Si algún valor no es válido
+    """
+    event, missing_field, error = DecisionEngine._parse_event(event_data)
+    if missing_field is not None:
+        raise KeyError(missing_field)
+    if event is None:
+        raise ValueError(error)
+    return event
@@ -3,18 +3,38 @@ Servicio de correo electrónico para envío de alertas del Executor Agent.
 Implementa envío SMTP SSL compatible con Gmail y otros proveedores.
 """
 
+import asyncio
+import email.policy
 import logging
 import os
+import queue
 import smtplib
 import ssl
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from email.message import EmailMessage
-from typing import List, Dict, Any, Optional
+from html import escape
+from itertools import groupby
+from operator import itemgetter
+from typing import Callable, Iterator, List, Dict, Any, Optional
 from dataclasses import dataclass
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Conexiones usadas hace menos de estos segundos se reutilizan sin verificar con NOOP
+_NOOP_AFTER_SEC = 1.0
+
+# Errores SMTP tras los cuales la conexión sigue siendo utilizable
+_RECOVERABLE_SMTP_ERRORS = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPDataError
+)
+
+@dataclass(frozen=True, slots=True)
 class EmailConfig:
     """Configuración del servicio de correo."""
     smtp_server: str
@@ -22,6 +42,8 @@ class EmailConfig:
     email_from: str
     email_password: str
     use_tls: bool = True
+    pipelining: bool = True
+    timeout: float = 5.0
 
 @dataclass
 class EmailResult:
@@ -32,6 +54,469 @@ class EmailResult:
     timestamp: float
     error_details: Optional[str] = None
 
+# Fragmentos estáticos del cuerpo HTML de las alertas
+_HTML_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; }
+        .header { background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin-bottom: 20px; }
+        .alert-critical { border-left: 5px solid #dc3545; }
+        .alert-high { border-left: 5px solid #fd7e14; }
+        .alert-medium { border-left: 5px solid #ffc107; }
+        .alert-low { border-left: 5px solid #28a745; }
+        .section { margin: 15px 0; }
+        .label { font-weight: bold; color: #495057; }
+        .value { margin-left: 10px; }
+        .decision { background-color: #e9ecef; padding: 10px; border-radius: 5px; margin-top: 15px; }
+        .footer { font-size: 12px; color: #6c757d; margin-top: 30px; }
+    </style>
+</head>
+<body>
+"""
+_HTML_HEADER = """    <div class="header alert-%s">
+        <h2>🚨 Executor Agent Alert</h2>
+        <p><strong>Timestamp:</strong> %s</p>
+    </div>
+"""
+_HTML_EVENT_SECTION = """    <div class="section">
+        <h3>📋 Event Details</h3>
+"""
+_HTML_DECISION_SECTION = """    </div>
+    <div class="decision">
+        <h3>🤖 Decision Made</h3>
+"""
+_HTML_TAIL = """    </div>
+    <div class="footer">
+        <p>This alert was generated automatically by the Executor Agent.</p>
+        <p>If you believe this is an error, please contact your system administrator.</p>
+    </div>
+</body>
+</html>
+"""
+_HTML_ROW = '        <p><span class="label">%s:</span> <span class="value">%s</span></p>\n'
+
+def _html_row(label: str, value: Any) -> str:
+    """Fila etiqueta/valor del cuerpo HTML con el valor escapado."""
+    return _HTML_ROW % (label, escape(str(value)))
+
+# Cola de envío asíncrono compartida por todas las instancias del servicio
+_alert_queue: Optional[asyncio.Queue] = None
+_alert_loop: Optional[asyncio.AbstractEventLoop] = None
+_alert_workers: List[asyncio.Task] = []
+
+def _drain_queue(alert_queue: asyncio.Queue, batch: List[tuple], batch_max: int) -> None:
+    """Añadir al lote los elementos ya disponibles en la cola sin esperar."""
+    while len(batch) < batch_max:
+        try:
+            batch.append(alert_queue.get_nowait())
+        except asyncio.QueueEmpty:
+            return
+
+async def _alert_worker(alert_queue: asyncio.Queue, batch_max: int, batch_window: float) -> None:
+    """
+    Enviar las alertas encoladas fuera del event loop.
+    
+    Tras recibir una alerta se acumulan las siguientes hasta batch_max o hasta
+    que pasa batch_window, y el lote se envía por una misma conexión SMTP.
+    """
+    while True:
+        batch = [await alert_queue.get()]
+        _drain_queue(alert_queue, batch, batch_max)
+        if len(batch) < batch_max and batch_window > 0:
+            await asyncio.sleep(batch_window)
+            _drain_queue(alert_queue, batch, batch_max)
+        
+        try:
+            for service, items in groupby(batch, key=itemgetter(0)):
+                items = list(items)
+                try:
+                    results = await asyncio.to_thread(service.send_alerts, [item[1:4] for item in items])
+                except Exception as e:
+                    for item in items:
+                        future = item[4]
+                        if future is None:
+                            logger.error("Queued alert for %s failed: %s", item[2].get("event_type"), e)
+                        elif not future.done():
+                            future.set_exception(e)
+                    continue
+                for item, result in zip(items, results):
+                    future = item[4]
+                    if future is None:
+                        # Envío sin esperar resultado: el fallo solo queda en el log
+                        if not result.success:
+                            logger.warning("Queued alert for %s not delivered: %s",
+                                           item[2].get("event_type"), result.message)
+                    elif not future.done():
+                        future.set_result(result)
+        finally:
+            for _ in batch:
+                alert_queue.task_done()
+
+def start_alert_workers(count: Optional[int] = None) -> None:
+    """
+    Iniciar los workers de envío asíncrono en el event loop actual.
+    
+    Args:
+        count: Número de workers (default: ALERT_SEND_WORKERS o 2)
+    """
+    global _alert_queue, _alert_loop
+    if _alert_workers:
+        return
+    
+    if count is None:
+        count = int(os.getenv("ALERT_SEND_WORKERS", "2"))
+    _alert_loop = asyncio.get_running_loop()
+    _alert_queue = asyncio.Queue()
+    batch_max = max(1, int(os.getenv("ALERT_BATCH_MAX", "32")))
+    batch_window = float(os.getenv("ALERT_BATCH_WINDOW_MS", "50")) / 1000.0
+    _alert_workers.extend(
+        asyncio.create_task(_alert_worker(_alert_queue, batch_max, batch_window))
+        for _ in range(max(1, count))
+    )
+    logger.info("Started %d alert email workers", len(_alert_workers))
+
+async def stop_alert_workers() -> None:
+    """Esperar el envío de las alertas pendientes y detener los workers."""
+    global _alert_queue, _alert_loop
+    if not _alert_workers:
+        return
+    
+    # Dejar correr los _put_alert programados con call_soon_threadsafe antes de
+    # esperar la cola; si no, join() retorna de inmediato y esas alertas se pierden
+    await asyncio.sleep(0)
+    await _alert_queue.join()
+    for task in _alert_workers:
+        task.cancel()
+    await asyncio.gather(*_alert_workers, return_exceptions=True)
+    _alert_workers.clear()
+    _alert_queue = None
+    _alert_loop = None
+
+class _TTLCache:
+    """
+    Conjunto LRU acotado cuyas claves expiran tras ttl segundos (thread-safe).
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self._maxsize = max(1, maxsize)
+        self._ttl = ttl
+        self._expiry: "OrderedDict[Any, float]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def contains(self, key: Any) -> bool:
+        """Indicar si la clave está registrada y no ha expirado."""
+        with self._lock:
+            expiry = self._expiry.get(key)
+            if expiry is None:
+                return False
+            if expiry <= time.monotonic():
+                del self._expiry[key]
+                return False
+            return True
+    
+    def add(self, key: Any) -> None:
+        """Registrar la clave durante ttl segundos, desalojando la más antigua si está lleno."""
+        with self._lock:
+            self._expiry[key] = time.monotonic() + self._ttl
+            self._expiry.move_to_end(key)
+            if len(self._expiry) > self._maxsize:
+                self._expiry.popitem(last=False)
+
+class _PipeliningSMTP(smtplib.SMTP):
+    """
+    Cliente SMTP que agrupa MAIL FROM y RCPT TO en una sola escritura (RFC 2920).
+    
+    Solo se usa PIPELINING cuando el servidor lo anuncia en la respuesta EHLO;
+    en caso contrario se recurre al envío secuencial de smtplib.
+    """
+    
+    pipelining = True
+    
+    def sendmail(self, from_addr, to_addrs, msg, mail_options=(), rcpt_options=()):
+        self.ehlo_or_helo_if_needed()
+        # Las opciones ESMTP explícitas (SMTPUTF8, 8BITMIME) requieren las validaciones de smtplib
+        if not self.pipelining or mail_options or not self.has_extn("pipelining"):
+            return super().sendmail(from_addr, to_addrs, msg, mail_options, rcpt_options)
+        
+        if isinstance(msg, str):
+            msg = smtplib._fix_eols(msg).encode("ascii")
+        if isinstance(to_addrs, str):
+            to_addrs = [to_addrs]
+        
+        mail_opts = " size=%d" % len(msg) if self.has_extn("size") else ""
+        rcpt_opts = " " + " ".join(rcpt_options) if rcpt_options else ""
+        commands = ["mail FROM:%s%s\r\n" % (smtplib.quoteaddr(from_addr), mail_opts)]
+        commands.extend("rcpt TO:%s%s\r\n" % (smtplib.quoteaddr(rcpt), rcpt_opts) for rcpt in to_addrs)
+        self.send("".join(commands))
+        
+        # Leer todas las respuestas del grupo antes de evaluar errores
+        mail_code, mail_resp = self.getreply()
+        rcpt_replies = [self.getreply() for _ in to_addrs]
+        
+        if mail_code != 250:
+            if mail_code == 421:
+                self.close()
+            else:
+                self._rset()
+            raise smtplib.SMTPSenderRefused(mail_code, mail_resp, from_addr)
+        
+        senderrs = {}
+        for rcpt, (code, resp) in zip(to_addrs, rcpt_replies):
+            if code not in (250, 251):
+                senderrs[rcpt] = (code, resp)
+            if code == 421:
+                self.close()
+                raise smtplib.SMTPRecipientsRefused(senderrs)
+        if len(senderrs) == len(to_addrs):
+            self._rset()
+            raise smtplib.SMTPRecipientsRefused(senderrs)
+        
+        code, resp = self.data(msg)
+        if code != 250:
+            if code == 421:
+                self.close()
+            else:
+                self._rset()
+            raise smtplib.SMTPDataError(code, resp)
+        return senderrs
+
+class _ResumableSSLContext(ssl.SSLContext):
+    """
+    SSLContext de cliente que ofrece la última sesión TLS al abrir conexiones.
+    
+    Las reconexiones del pool reanudan así la sesión (tickets en TLS 1.3,
+    session IDs en TLS 1.2) en lugar de repetir el handshake completo.
+    """
+    
+    session: Optional[ssl.SSLSession] = None
+    
+    def wrap_socket(self, sock, *args, session=None, **kwargs):
+        return super().wrap_socket(sock, *args, session=session or self.session, **kwargs)
+
+class _PooledConnection:
+    """Conexión SMTP autenticada junto con su último instante de uso."""
+    
+    __slots__ = ("smtp", "last_used")
+    
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+
+class _ConnectionPool:
+    """
+    Pool thread-safe de conexiones SMTP autenticadas.
+    
+    Mantiene abiertas hasta max_size conexiones para reutilizar el handshake
+    TCP/TLS y el AUTH entre envíos. Al adquirir una conexión inactiva se
+    verifica con NOOP y se reemplaza si el servidor la cerró; las conexiones
+    inactivas por más de idle_timeout segundos se cierran en segundo plano.
+    Con keepalive_interval > 0 un hilo envía NOOP periódicamente a las
+    conexiones inactivas para que el servidor no las cierre por timeout; cada
+    NOOP correcto renueva last_used, por lo que idle_timeout solo cierra las
+    conexiones que el keepalive no alcanza a mantener.
+    """
+    
+    def __init__(self,
+                 connect: Callable[[], smtplib.SMTP],
+                 max_size: int,
+                 idle_timeout: float,
+                 keepalive_interval: float = 0):
+        self._connect = connect
+        self._max_size = max(1, max_size)
+        self._idle_timeout = idle_timeout
+        self._keepalive_interval = keepalive_interval
+        self._idle: "queue.LifoQueue[_PooledConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self._max_size)
+        self._lock = threading.Lock()
+        self._reaper: Optional[threading.Timer] = None
+        self._keepalive_stop: Optional[threading.Event] = None
+        self.logger = logging.getLogger(f"{__name__}.ConnectionPool")
+    
+    def acquire(self) -> _PooledConnection:
+        """
+        Obtener una conexión lista para enviar (bloquea si el pool está lleno).
+        
+        Returns:
+            Conexión autenticada
+        """
+        self._slots.acquire()
+        try:
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                if self._is_usable(conn):
+                    return conn
+                self._close(conn)
+            return _PooledConnection(self._connect())
+        except BaseException:
+            self._slots.release()
+            raise
+    
+    def release(self, conn: _PooledConnection, discard: bool = False) -> None:
+        """
+        Devolver una conexión al pool.
+        
+        Args:
+            conn: Conexión obtenida con acquire()
+            discard: Cerrar la conexión en lugar de reutilizarla
+        """
+        try:
+            if discard:
+                self._close(conn)
+            else:
+                conn.last_used = time.monotonic()
+                self._idle.put(conn)
+                self._schedule_reap()
+                self._ensure_keepalive()
+        finally:
+            self._slots.release()
+    
+    @contextmanager
+    def connection(self) -> Iterator[_PooledConnection]:
+        """
+        Usar una conexión del pool dentro de un bloque with.
+        
+        Al salir la conexión vuelve al pool; se descarta si el bloque falla con
+        un error que deja la sesión SMTP en estado desconocido.
+        
+        Yields:
+            Conexión autenticada
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+        except _RECOVERABLE_SMTP_ERRORS:
+            self.release(conn)
+            raise
+        except BaseException:
+            self.release(conn, discard=True)
+            raise
+        self.release(conn)
+    
+    def close_all(self) -> None:
+        """Cerrar todas las conexiones inactivas."""
+        with self._lock:
+            if self._reaper is not None:
+                self._reaper.cancel()
+                self._reaper = None
+            if self._keepalive_stop is not None:
+                self._keepalive_stop.set()
+                self._keepalive_stop = None
+        while True:
+            try:
+                self._close(self._idle.get_nowait())
+            except queue.Empty:
+                return
+    
+    def _is_usable(self, conn: _PooledConnection) -> bool:
+        """Verificar que una conexión inactiva no expiró y sigue abierta (NOOP)."""
+        idle = time.monotonic() - conn.last_used
+        if idle > self._idle_timeout:
+            return False
+        if idle < _NOOP_AFTER_SEC:
+            # Recién usada: un corte se detecta al enviar y se reintenta
+            return True
+        return self._noop(conn)
+    
+    def _noop(self, conn: _PooledConnection) -> bool:
+        """Enviar NOOP y confirmar que el servidor responde."""
+        try:
+            code = conn.smtp.noop()[0]
+        except (smtplib.SMTPException, OSError):
+            return False
+        return 200 <= code < 300
+    
+    def _close(self, conn: _PooledConnection) -> None:
+        """Cerrar una conexión ignorando errores del servidor."""
+        try:
+            conn.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            conn.smtp.close()
+    
+    def _schedule_reap(self) -> None:
+        """Programar el cierre de conexiones inactivas si no hay uno pendiente."""
+        with self._lock:
+            if self._reaper is None:
+                self._reaper = threading.Timer(self._idle_timeout, self._reap)
+                self._reaper.daemon = True
+                self._reaper.start()
+    
+    def _ensure_keepalive(self) -> None:
+        """Iniciar el hilo de keepalive si está habilitado y no está en marcha."""
+        if self._keepalive_interval <= 0:
+            return
+        with self._lock:
+            if self._keepalive_stop is not None:
+                return
+            self._keepalive_stop = threading.Event()
+            threading.Thread(
+                target=self._keepalive_loop,
+                args=(self._keepalive_stop,),
+                name="smtp-keepalive",
+                daemon=True
+            ).start()
+    
+    def _keepalive_loop(self, stop: threading.Event) -> None:
+        """Enviar NOOP a las conexiones inactivas cada keepalive_interval segundos."""
+        while not stop.wait(self._keepalive_interval):
+            self._ping_idle()
+    
+    def _ping_idle(self) -> None:
+        """Mantener vivas las conexiones inactivas, descartando las caídas o expiradas."""
+        alive = []
+        now = time.monotonic()
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if now - conn.last_used >= self._idle_timeout or not self._noop(conn):
+                self._close(conn)
+            else:
+                # El NOOP confirma la sesión y cuenta como uso
+                conn.last_used = time.monotonic()
+                alive.append(conn)
+        
+        # Reinsertar en orden LIFO; mientras tanto pudieron abrirse conexiones nuevas
+        for conn in reversed(alive):
+            if self._idle.qsize() >= self._max_size:
+                self._close(conn)
+            else:
+                self._idle.put(conn)
+    
+    def _reap(self) -> None:
+        """Cerrar las conexiones que superaron el tiempo de inactividad."""
+        with self._lock:
+            self._reaper = None
+        
+        keep = []
+        now = time.monotonic()
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if now - conn.last_used >= self._idle_timeout:
+                self._close(conn)
+            else:
+                keep.append(conn)
+        
+        # Reinsertar de la más antigua a la más reciente para conservar el orden LIFO
+        for conn in reversed(keep):
+            self._idle.put(conn)
+        if keep:
+            self._schedule_reap()
+
+# Pools compartidos entre instancias de EmailService con la misma configuración
+# (servidor, puerto y credenciales), de modo que un servicio nuevo reutiliza
+# las conexiones ya autenticadas en lugar de repetir el handshake TCP/TLS
+_pools: Dict[EmailConfig, _ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
 class EmailService:
     """
     Servicio reutilizable para envío de correos electrónicos.
@@ -42,6 +527,20 @@ class EmailService:
         """Inicializar el servicio de correo con configuración desde entorno."""
         self.logger = logging.getLogger(f"{__name__}.EmailService")
         self.config = self._load_config()
+        self._ssl_ctx = self._create_ssl_context()
+        self._msg_template = self._create_message_template()
+        dedup_ttl = float(os.getenv("ALERT_DEDUP_TTL_SEC", "30"))
+        self._dedup = _TTLCache(maxsize=512, ttl=dedup_ttl) if dedup_ttl > 0 else None
+        with _pools_lock:
+            pool = _pools.get(self.config)
+            if pool is None:
+                pool = _pools[self.config] = _ConnectionPool(
+                    self._connect,
+                    max_size=int(os.getenv("ALERT_SMTP_POOL_SIZE", "4")),
+                    idle_timeout=float(os.getenv("ALERT_SMTP_IDLE_SEC", "60")),
+                    keepalive_interval=float(os.getenv("ALERT_SMTP_KEEPALIVE_SEC", "20"))
+                )
+        self._pool = pool
         
     def _load_config(self) -> EmailConfig:
         """
@@ -53,9 +552,11 @@ class EmailService:
         Raises:
             ValueError: Si faltan variables de entorno requeridas
         """
+        env = os.environ
+        
         # Variables de entorno requeridas
-        email_from = os.getenv("ALERT_EMAIL_FROM")
-        email_password = os.getenv("ALERT_EMAIL_PASSWORD")
+        email_from = env.get("ALERT_EMAIL_FROM")
+        email_password = env.get("ALERT_EMAIL_PASSWORD")
         
         if not email_from or not email_password:
             raise ValueError(
@@ -63,21 +564,51 @@ class EmailService:
             )
         
         # Configuración SMTP con valores por defecto para Gmail
-        smtp_server = os.getenv("ALERT_SMTP_SERVER", "smtp.gmail.com")
-        smtp_port = int(os.getenv("ALERT_SMTP_PORT", "587"))
-        use_tls = os.getenv("ALERT_USE_TLS", "true").lower() == "true"
+        smtp_server = env.get("ALERT_SMTP_SERVER", "smtp.gmail.com")
+        smtp_port = int(env.get("ALERT_SMTP_PORT", "587"))
+        use_tls = env.get("ALERT_USE_TLS", "true").lower() == "true"
+        pipelining = env.get("ALERT_SMTP_PIPELINE", "true").lower() == "true"
+        timeout = float(env.get("ALERT_SMTP_TIMEOUT_SEC", "5"))
         
         config = EmailConfig(
             smtp_server=smtp_server,
             smtp_port=smtp_port,
             email_from=email_from,
             email_password=email_password,
-            use_tls=use_tls
+            use_tls=use_tls,
+            pipelining=pipelining,
+            timeout=timeout
         )
         
-        self.logger.info(f"Email service configured for {config.email_from}")
+        self.logger.info("Email service configured for %s", config.email_from)
         return config
     
+    def _create_message_template(self) -> EmailMessage:
+        """
+        Crear la plantilla de mensaje con la política SMTP y el remitente fijo.
+        
+        Returns:
+            Mensaje base que se copia para cada alerta
+        """
+        template = EmailMessage(policy=email.policy.SMTP)
+        template["From"] = self.config.email_from
+        return template
+    
+    def _new_message(self) -> EmailMessage:
+        """
+        Crear un mensaje nuevo con las cabeceras fijas de la plantilla.
+        
+        Las cabeceras de la plantilla ya están parseadas; la política SMTP
+        reutiliza esos objetos al asignarlos, por lo que no se vuelven a parsear.
+        
+        Returns:
+            Mensaje listo para añadir destinatarios, asunto y contenido
+        """
+        msg = EmailMessage(policy=email.policy.SMTP)
+        for name, value in self._msg_template.items():
+            msg[name] = value
+        return msg
+    
     def _create_alert_email(self, 
                            to_emails: List[str], 
                            event_data: Dict[str, Any], 
@@ -93,13 +624,12 @@ class EmailService:
         Returns:
             Mensaje de correo configurado
         """
-        msg = EmailMessage()
+        msg = self._new_message()
         
-        # Configurar destinatarios
-        msg["From"] = self.config.email_from
-        msg["To"] = ", ".join(to_emails)
+        # Configurar destinatarios (From viene de la plantilla)
+        msg["To"] = to_emails[0] if len(to_emails) == 1 else ", ".join(to_emails)
         
-        # Asunto del correo
+        # Asunto del correo (los mismos valores se reutilizan en el cuerpo)
         severity = event_data.get("severity", "UNKNOWN")
         event_type = event_data.get("event_type", "UNKNOWN")
         resource = event_data.get("resource", "UNKNOWN")
@@ -108,76 +638,51 @@ class EmailService:
         msg["Subject"] = subject
         
         # Cuerpo del correo en formato HTML
-        html_body = self._build_html_body(event_data, decision_data)
-        msg.set_content(html_body, subtype='html')
+        html_body = self._build_html_body(event_data, decision_data, severity, event_type, resource)
+        msg.set_content(html_body, subtype='html', charset='utf-8', cte='base64')
         
         return msg
     
-    def _build_html_body(self, event_data: Dict[str, Any], decision_data: Dict[str, Any]) -> str:
+    def _build_html_body(self,
+                         event_data: Dict[str, Any],
+                         decision_data: Dict[str, Any],
+                         severity: Any,
+                         event_type: Any,
+                         resource: Any) -> str:
         """
         Construir cuerpo HTML del correo con formato profesional.
         
         Args:
             event_data: Datos del evento
             decision_data: Datos de la decisión
+            severity: Severidad ya extraída del evento
+            event_type: Tipo de evento ya extraído
+            resource: Recurso afectado ya extraído
             
         Returns:
             Cuerpo HTML formateado
         """
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
+        event_get = event_data.get
+        decision_get = decision_data.get
         
-        html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; }}
-                .header {{ background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin-bottom: 20px; }}
-                .alert-critical {{ border-left: 5px solid #dc3545; }}
-                .alert-high {{ border-left: 5px solid #fd7e14; }}
-                .alert-medium {{ border-left: 5px solid #ffc107; }}
-                .alert-low {{ border-left: 5px solid #28a745; }}
-                .section {{ margin: 15px 0; }}
-                .label {{ font-weight: bold; color: #495057; }}
-                .value {{ margin-left: 10px; }}
-                .decision {{ background-color: #e9ecef; padding: 10px; border-radius: 5px; margin-top: 15px; }}
-                .footer {{ font-size: 12px; color: #6c757d; margin-top: 30px; }}
-            </style>
-        </head>
-        <body>
-            <div class="header alert-{event_data.get('severity', 'unknown').lower()}">
-                <h2>🚨 Executor Agent Alert</h2>
-                <p><strong>Timestamp:</strong> {timestamp}</p>
-            </div>
-            
-            <div class="section">
-                <h3>📋 Event Details</h3>
-                <p><span class="label">Event Type:</span> <span class="value">{event_data.get('event_type', 'N/A')}</span></p>
-                <p><span class="label">Resource:</span> <span class="value">{event_data.get('resource', 'N/A')}</span></p>
-                <p><span class="label">Severity:</span> <span class="value">{event_data.get('severity', 'N/A')}</span></p>
-                <p><span class="label">Business Impact:</span> <span class="value">{event_data.get('business_impact', 'N/A')}</span></p>
-                <p><span class="label">Time to Impact:</span> <span class="value">{event_data.get('time_to_impact', 'N/A')} minutes</span></p>
-                <p><span class="label">Confidence:</span> <span class="value">{event_data.get('confidence', 'N/A')}</span></p>
-            </div>
-            
-            <div class="decision">
-                <h3>🤖 Decision Made</h3>
-                <p><span class="label">Decision:</span> <span class="value">{decision_data.get('decision', 'N/A')}</span></p>
-                <p><span class="label">Risk Score:</span> <span class="value">{decision_data.get('score', 'N/A')}</span></p>
-                <p><span class="label">Actions Executed:</span> <span class="value">{', '.join(decision_data.get('actions_executed', []))}</span></p>
-                <p><span class="label">Reasoning:</span> <span class="value">{decision_data.get('reasoning', 'N/A')}</span></p>
-            </div>
-            
-            <div class="footer">
-                <p>This alert was generated automatically by the Executor Agent.</p>
-                <p>If you believe this is an error, please contact your system administrator.</p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        return html
+        return "".join((
+            _HTML_HEAD,
+            _HTML_HEADER % (escape(str(severity).lower()), timestamp),
+            _HTML_EVENT_SECTION,
+            _html_row("Event Type", event_type),
+            _html_row("Resource", resource),
+            _html_row("Severity", severity),
+            _html_row("Business Impact", event_get('business_impact', 'N/A')),
+            _html_row("Time to Impact", f"{event_get('time_to_impact', 'N/A')} minutes"),
+            _html_row("Confidence", event_get('confidence', 'N/A')),
+            _HTML_DECISION_SECTION,
+            _html_row("Decision", decision_get('decision', 'N/A')),
+            _html_row("Risk Score", decision_get('score', 'N/A')),
+            _html_row("Actions Executed", ', '.join(decision_get('actions_executed', []))),
+            _html_row("Reasoning", decision_get('reasoning', 'N/A')),
+            _HTML_TAIL
+        ))
     
     def send_alert(self, 
                    to_emails: List[str], 
@@ -207,26 +712,29 @@ class EmailService:
                     error_details="Empty recipient list"
                 )
             
+            # Omitir alertas idénticas enviadas recientemente
+            dedup_key = self._dedup_key(to_emails, event_data, decision_data)
+            if dedup_key is not None and self._dedup.contains(dedup_key):
+                self.logger.info("Duplicate alert suppressed: %s on %s", dedup_key[0], dedup_key[1])
+                return EmailResult(
+                    success=True,
+                    message="deduped",
+                    recipients=to_emails,
+                    timestamp=timestamp
+                )
+            
             # Crear mensaje
             msg = self._create_alert_email(to_emails, event_data, decision_data)
             
             # Enviar correo
-            self.logger.info(f"Sending alert email to {len(to_emails)} recipients")
+            self.logger.info("Sending alert email to %d recipients", len(to_emails))
             
-            # Crear contexto SSL/TLS con verificación deshabilitada para Gmail
-            context = ssl.create_default_context()
-            context.check_hostname = False
-            context.verify_mode = ssl.CERT_NONE
+            # Enviar por una conexión del pool
+            self._send(msg)
             
-            # Conectar y enviar
-            with smtplib.SMTP(self.config.smtp_server, self.config.smtp_port) as server:
-                if self.config.use_tls:
-                    server.starttls(context=context)
-                
-                server.login(self.config.email_from, self.config.email_password)
-                server.send_message(msg)
-            
-            self.logger.info(f"Alert email sent successfully to {to_emails}")
+            self.logger.info("Alert email sent successfully to %s", to_emails)
+            if dedup_key is not None:
+                self._dedup.add(dedup_key)
             
             return EmailResult(
                 success=True,
@@ -279,6 +787,196 @@ class EmailService:
                 error_details=error_msg
             )
     
+    def _dedup_key(self,
+                   to_emails: List[str],
+                   event_data: Dict[str, Any],
+                   decision_data: Dict[str, Any]) -> Optional[tuple]:
+        """
+        Clave que identifica alertas equivalentes dentro de la ventana de deduplicación.
+        
+        Returns:
+            Tupla hashable, o None si la deduplicación está desactivada o no aplica
+        """
+        if self._dedup is None:
+            return None
+        key = (
+            event_data.get("event_type"),
+            event_data.get("resource"),
+            event_data.get("severity"),
+            decision_data.get("decision"),
+            tuple(to_emails)
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+    
+    def send_alerts(self, alerts: List[tuple]) -> List[EmailResult]:
+        """
+        Enviar varias alertas de forma consecutiva.
+        
+        El pool devuelve la conexión usada más recientemente, por lo que el lote
+        comparte una sola sesión SMTP (un EHLO/AUTH, varios MAIL/RCPT/DATA).
+        
+        Args:
+            alerts: Tuplas (to_emails, event_data, decision_data)
+            
+        Returns:
+            Resultado de cada envío, en el mismo orden
+        """
+        send_alert = self.send_alert
+        return [send_alert(to_emails, event_data, decision_data)
+                for to_emails, event_data, decision_data in alerts]
+    
+    async def send_alert_async(self,
+                               to_emails: List[str],
+                               event_data: Dict[str, Any],
+                               decision_data: Dict[str, Any]) -> EmailResult:
+        """
+        Enviar una alerta desde código asíncrono sin bloquear el event loop.
+        
+        El envío se ejecuta en un hilo sobre las conexiones persistentes del
+        pool, de modo que varias alertas concurrentes solapan su latencia SMTP.
+        
+        Args:
+            to_emails: Lista de destinatarios
+            event_data: Datos del evento
+            decision_data: Datos de la decisión
+            
+        Returns:
+            Resultado del envío
+        """
+        return await asyncio.to_thread(self.send_alert, to_emails, event_data, decision_data)
+    
+    async def enqueue_alert(self,
+                            to_emails: List[str],
+                            event_data: Dict[str, Any],
+                            decision_data: Dict[str, Any]) -> "asyncio.Future[EmailResult]":
+        """
+        Encolar una alerta para envío en segundo plano sin bloquear el event loop.
+        
+        Args:
+            to_emails: Lista de destinatarios
+            event_data: Datos del evento
+            decision_data: Datos de la decisión
+            
+        Returns:
+            Future que se resuelve con el resultado del envío
+        """
+        if not _alert_workers:
+            start_alert_workers()
+        
+        future = _alert_loop.create_future()
+        _alert_queue.put_nowait((self, to_emails, event_data, decision_data, future))
+        return future
+    
+    def submit_alert(self,
+                     to_emails: List[str],
+                     event_data: Dict[str, Any],
+                     decision_data: Dict[str, Any]) -> bool:
+        """
+        Entregar una alerta a la cola asíncrona desde cualquier hilo.
+        
+        Args:
+            to_emails: Lista de destinatarios
+            event_data: Datos del evento
+            decision_data: Datos de la decisión
+            
+        Returns:
+            False si no hay workers activos y el envío debe hacerse de forma síncrona
+        """
+        loop = _alert_loop
+        if loop is None or loop.is_closed():
+            return False
+        
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        
+        if running is loop:
+            # Ya en el hilo del event loop: encolar de inmediato para que
+            # stop_alert_workers() vea la alerta al esperar la cola
+            self._put_alert(to_emails, event_data, decision_data)
+        else:
+            loop.call_soon_threadsafe(self._put_alert, to_emails, event_data, decision_data)
+        return True
+    
+    def _put_alert(self, to_emails: List[str], event_data: Dict[str, Any], decision_data: Dict[str, Any]) -> None:
+        """Encolar una alerta desde el event loop de los workers."""
+        if _alert_queue is None:
+            # Los workers se detuvieron mientras la alerta estaba en tránsito
+            asyncio.get_running_loop().run_in_executor(None, self.send_alert, to_emails, event_data, decision_data)
+            return
+        # Sin future: nadie espera el resultado y un fallo no debe quedar sin recuperar
+        _alert_queue.put_nowait((self, to_emails, event_data, decision_data, None))
+    
+    def _create_ssl_context(self) -> ssl.SSLContext:
+        """
+        Crear el contexto SSL/TLS compartido por todas las conexiones.
+        
+        Returns:
+            Contexto con verificación deshabilitada para Gmail
+        """
+        context = _ResumableSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        context.set_ciphers("ECDHE+AESGCM:ECDHE+CHACHA20")
+        # TLS 1.3 se negocia cuando el servidor lo soporta; TLS 1.2 queda como respaldo
+        context.minimum_version = ssl.TLSVersion.TLSv1_2
+        context.options &= ~ssl.OP_NO_TICKET
+        return context
+    
+    def _connect(self) -> smtplib.SMTP:
+        """
+        Abrir y autenticar una nueva conexión SMTP.
+        
+        Returns:
+            Conexión lista para enviar
+        """
+        config = self.config
+        server = _PipeliningSMTP(config.smtp_server, config.smtp_port, timeout=config.timeout)
+        server.pipelining = config.pipelining
+        try:
+            if config.use_tls:
+                server.starttls(context=self._ssl_ctx)
+            
+            server.login(config.email_from, config.email_password)
+        except BaseException:
+            server.close()
+            raise
+        
+        # Guardar la sesión tras el primer intercambio (los tickets TLS 1.3 llegan después del handshake)
+        if isinstance(server.sock, ssl.SSLSocket) and server.sock.session is not None:
+            self._ssl_ctx.session = server.sock.session
+        return server
+    
+    def _send(self, msg: EmailMessage) -> None:
+        """
+        Enviar un mensaje por una conexión del pool.
+        
+        Si el servidor cerró la conexión reutilizada, se reintenta una vez con
+        una conexión nueva. Las conexiones quedan descartadas tras cualquier
+        error que deje la sesión en estado desconocido.
+        
+        Args:
+            msg: Mensaje a enviar
+        """
+        for attempt in range(2):
+            try:
+                with self._pool.connection() as conn:
+                    conn.smtp.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                if attempt:
+                    raise
+                continue
+            return
+    
+    def close(self) -> None:
+        """Cerrar las conexiones SMTP inactivas del pool del servicio (compartido con servicios de igual configuración)."""
+        self._pool.close_all()
+    
     def test_connection(self) -> bool:
         """
         Probar la conexión con el servidor SMTP.
@@ -287,19 +985,24 @@ class EmailService:
             True si la conexión es exitosa
         """
         try:
-            context = ssl.create_default_context()
-            context.check_hostname = False
-            context.verify_mode = ssl.CERT_NONE
-            
-            with smtplib.SMTP(self.config.smtp_server, self.config.smtp_port) as server:
-                if self.config.use_tls:
-                    server.starttls(context=context)
-                
-                server.login(self.config.email_from, self.config.email_password)
+            # NOOP explícito: el pool omite la verificación en conexiones recién
+            # usadas. Una conexión cerrada por el servidor se reemplaza una vez;
+            # la conexión verificada queda disponible en el pool para envíos
+            for attempt in range(2):
+                try:
+                    with self._pool.connection() as conn:
+                        code, response = conn.smtp.noop()
+                except smtplib.SMTPServerDisconnected:
+                    if attempt:
+                        raise
+                    continue
+                if not 200 <= code < 300:
+                    raise smtplib.SMTPResponseException(code, response)
+                break
             
             self.logger.info("SMTP connection test successful")
             return True
             
         except Exception as e:
-            self.logger.error(f"SMTP connection test failed: {str(e)}")
+            self.logger.error("SMTP connection test failed: %s", e)
             return False
@@ -5,16 +5,83 @@ Implementa las funciones que el agente puede usar para procesar eventos y tomar
 
 import logging
 import json
-from typing import Dict, Any, List, Optional
-from decision_engine import DecisionEngine, Event, DecisionResult
+import os
+from operator import attrgetter
+from typing import Callable, Dict, Any, List, Optional
+from decision_engine import DecisionEngine, DecisionResult, parse_event
 from action_system import ActionExecutor
+from json_utils import to_json, from_json
 
 logger = logging.getLogger(__name__)
 
+# Tamaño máximo aceptado para event_data; entradas mayores se rechazan sin parsearlas
+_MAX_EVENT_DATA_SIZE = int(os.getenv("EVENT_DATA_MAX_SIZE", "64000"))
+
+# Primeros caracteres válidos de un objeto JSON (con espacios iniciales)
+_JSON_OBJECT_START = frozenset("{ \t\n\r")
+
+# Extractores de campos para serializar resultados
+_execution_fields = attrgetter("action_name", "result", "message", "timestamp")
+_decision_fields = attrgetter("decision", "score", "actions_executed", "status", "reasoning", "timestamp")
+
+# Respuestas de error estáticas, serializadas una sola vez
+_SYSTEM_NOT_INITIALIZED = {
+    "status": "error",
+    "message": "Decision engine or action executor not initialized",
+    "decision": "LOG_ONLY",
+    "score": 0.0,
+    "actions_executed": [],
+    "reasoning": "System not properly initialized"
+}
+_ERR_SYSTEM_NOT_INITIALIZED = to_json(_SYSTEM_NOT_INITIALIZED)
+_ERR_EVENT_TOO_LARGE = to_json({
+    "status": "error",
+    "message": f"Event data exceeds {_MAX_EVENT_DATA_SIZE} characters",
+    "decision": "LOG_ONLY",
+    "score": 0.0,
+    "actions_executed": ["log_error"],
+    "reasoning": "Input rejected before parsing"
+})
+_ERR_EVENT_NOT_OBJECT = to_json({
+    "status": "error",
+    "message": "Invalid JSON format: event data must be a JSON object",
+    "decision": "LOG_ONLY",
+    "score": 0.0,
+    "actions_executed": ["log_error"],
+    "reasoning": "Input rejected before parsing"
+})
+_ERR_HISTORY_NOT_INITIALIZED = to_json({
+    "status": "error",
+    "message": "Decision engine not initialized",
+    "history": []
+})
+_ERR_SCORE_NOT_INITIALIZED = to_json({
+    "status": "error",
+    "message": "Decision engine not initialized",
+    "score": 0.0
+})
+_ERR_ACTIONS_NOT_INITIALIZED = to_json({
+    "status": "error",
+    "message": "Action executor not initialized",
+    "actions": []
+})
+_ERR_THRESHOLDS_NOT_INITIALIZED = to_json({
+    "status": "error",
+    "message": "Decision engine not initialized",
+    "thresholds": {}
+})
+
 # Instancias globales (se inicializan en agent.py)
 decision_engine: Optional[DecisionEngine] = None
 action_executor: Optional[ActionExecutor] = None
 
+# Métodos de uso frecuente, enlazados en initialize_tools
+_process_engine_event: Optional[Callable[[Dict[str, Any]], DecisionResult]] = None
+_execute_actions: Optional[Callable[..., List[Any]]] = None
+
+# Respuesta de get_decision_thresholds, constante mientras no cambien los umbrales
+_thresholds_json: Optional[str] = None
+
 def initialize_tools(dec_engine: DecisionEngine, act_executor: ActionExecutor):
     """
     Inicializar las herramientas con las instancias del DecisionEngine y ActionExecutor.
@@ -23,11 +90,39 @@ def initialize_tools(dec_engine: DecisionEngine, act_executor: ActionExecutor):
         dec_engine: Instancia del DecisionEngine
         act_executor: Instancia del ActionExecutor
     """
-    global decision_engine, action_executor
+    global decision_engine, action_executor, _process_engine_event, _execute_actions
     decision_engine = dec_engine
     action_executor = act_executor
+    _process_engine_event = dec_engine.process_event
+    _execute_actions = act_executor.execute_actions
+    reload_thresholds()
     logger.info("Executor tools initialized successfully")
 
+def reload_thresholds() -> None:
+    """
+    Recalcular la respuesta cacheada de get_decision_thresholds().
+    
+    Debe llamarse tras modificar umbrales o pesos del DecisionEngine en caliente.
+    """
+    global _thresholds_json
+    if not decision_engine:
+        _thresholds_json = None
+        return
+    
+    thresholds = {
+        "immediate_threshold": decision_engine.IMMEDIATE_THRESHOLD,
+        "alert_threshold": decision_engine.ALERT_THRESHOLD,
+        "confidence_threshold": decision_engine.CONFIDENCE_THRESHOLD,
+        "severity_weights": {k.value: v for k, v in decision_engine.SEVERITY_WEIGHTS.items()},
+        "impact_weights": {k.value: v for k, v in decision_engine.IMPACT_WEIGHTS.items()},
+        "urgency_weight": decision_engine.URGENCY_WEIGHT
+    }
+    
+    _thresholds_json = to_json({
+        "status": "success",
+        "thresholds": thresholds
+    })
+
 def process_event(event_data: str) -> str:
     """
     Procesar un evento y ejecutar acciones basadas en decisión autónoma.
@@ -40,56 +135,17 @@ def process_event(event_data: str) -> str:
     """
     try:
         if not decision_engine or not action_executor:
-            return json.dumps({
-                "status": "error",
-                "message": "Decision engine or action executor not initialized",
-                "decision": "LOG_ONLY",
-                "score": 0.0,
-                "actions_executed": [],
-                "reasoning": "System not properly initialized"
-            })
-        
-        # Parsear evento
-        event_dict = json.loads(event_data)
-        
-        # Procesar evento con DecisionEngine
-        decision_result = decision_engine.process_event(event_dict)
-        
-        # Preparar contexto para acciones
-        action_context = {
-            "event": event_dict,
-            "decision": decision_result.decision,
-            "score": decision_result.score,
-            "reasoning": decision_result.reasoning
-        }
+            return _ERR_SYSTEM_NOT_INITIALIZED
         
-        # Ejecutar acciones
-        action_executions = action_executor.execute_actions(
-            decision_result.actions_executed, 
-            action_context
-        )
-        
-        # Construir respuesta estructurada
-        response = {
-            "decision": decision_result.decision.value,
-            "score": decision_result.score,
-            "actions_executed": [ae.action_name for ae in action_executions],
-            "action_results": [
-                {
-                    "action": ae.action_name,
-                    "result": ae.result.value,
-                    "message": ae.message,
-                    "timestamp": ae.timestamp
-                }
-                for ae in action_executions
-            ],
-            "status": decision_result.status,
-            "reasoning": decision_result.reasoning,
-            "timestamp": decision_result.timestamp
-        }
+        # Rechazar en O(1) entradas demasiado grandes o que no pueden ser un objeto JSON
+        if isinstance(event_data, str):
+            if len(event_data) > _MAX_EVENT_DATA_SIZE:
+                return _ERR_EVENT_TOO_LARGE
+            if not event_data or event_data[0] not in _JSON_OBJECT_START:
+                return _ERR_EVENT_NOT_OBJECT
         
-        logger.info(f"Event processed: {event_dict.get('event_type')} -> {decision_result.decision.value}")
-        return json.dumps(response, indent=2)
+        # Parsear evento
+        event_dict = from_json(event_data)
         
     except json.JSONDecodeError as e:
         error_response = {
@@ -100,19 +156,125 @@ def process_event(event_data: str) -> str:
             "actions_executed": ["log_error"],
             "reasoning": f"JSON parsing error: {str(e)}"
         }
-        return json.dumps(error_response, indent=2)
+        return to_json(error_response)
         
     except Exception as e:
-        logger.error(f"Error processing event: {str(e)}")
-        error_response = {
-            "status": "error",
-            "message": f"Processing error: {str(e)}",
-            "decision": "LOG_ONLY",
-            "score": 0.0,
-            "actions_executed": ["log_error"],
-            "reasoning": f"Unexpected error: {str(e)}"
-        }
-        return json.dumps(error_response, indent=2)
+        logger.error("Error processing event: %s", e)
+        return to_json(_processing_error(e))
+    
+    return to_json(process_event_obj(event_dict))
+
+def process_event_obj(event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Procesar un evento ya parseado, sin pasar por JSON.
+    
+    Ruta rápida para llamadas dentro del mismo proceso; process_event la usa
+    tras parsear event_data.
+    
+    Args:
+        event_dict: Diccionario con datos del evento
+        
+    Returns:
+        Diccionario con resultado estructurado de la decisión
+    """
+    try:
+        if not decision_engine or not action_executor:
+            return dict(_SYSTEM_NOT_INITIALIZED)
+        
+        # Procesar evento con DecisionEngine
+        decision_result = _process_engine_event(event_dict)
+        
+        # Ejecutar acciones (el contexto se construye desde el DecisionResult)
+        action_executions = _execute_actions(
+            decision_result.actions_executed,
+            decision_result,
+            event_dict
+        )
+        
+        return _event_response(event_dict, decision_result, action_executions)
+        
+    except Exception as e:
+        logger.error("Error processing event: %s", e)
+        return _processing_error(e)
+
+async def process_event_obj_async(event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Versión asíncrona de process_event_obj.
+    
+    La decisión se toma de inmediato y las acciones se ejecutan de forma
+    concurrente sin bloquear el event loop, de modo que varios eventos
+    lanzados a la vez solapan la latencia de sus envíos.
+    
+    Args:
+        event_dict: Diccionario con datos del evento
+        
+    Returns:
+        Diccionario con resultado estructurado de la decisión
+    """
+    try:
+        if not decision_engine or not action_executor:
+            return dict(_SYSTEM_NOT_INITIALIZED)
+        
+        decision_result = _process_engine_event(event_dict)
+        
+        action_executions = await action_executor.execute_actions_async(
+            decision_result.actions_executed,
+            decision_result,
+            event_dict
+        )
+        
+        return _event_response(event_dict, decision_result, action_executions)
+        
+    except Exception as e:
+        logger.error("Error processing event: %s", e)
+        return _processing_error(e)
+
+def _event_response(event_dict: Dict[str, Any],
+                    decision_result: DecisionResult,
+                    action_executions: List[Any]) -> Dict[str, Any]:
+    """
+    Construir la respuesta estructurada de un evento procesado.
+    
+    Args:
+        event_dict: Diccionario con datos del evento
+        decision_result: Resultado de la decisión
+        action_executions: Resultados de las acciones ejecutadas
+        
+    Returns:
+        Diccionario con resultado estructurado de la decisión
+    """
+    response = {
+        "decision": decision_result.decision.value,
+        "score": decision_result.score,
+        "actions_executed": [ae.action_name for ae in action_executions],
+        "action_results": [
+            {
+                "action": action_name,
+                "result": result.value,
+                "message": message,
+                "timestamp": timestamp
+            }
+            for action_name, result, message, timestamp in map(_execution_fields, action_executions)
+        ],
+        "status": decision_result.status,
+        "reasoning": decision_result.reasoning,
+        "timestamp": decision_result.timestamp
+    }
+    
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Event processed: %s -> %s", event_dict.get('event_type'), decision_result.decision.value)
+    return response
+
+def _processing_error(e: Exception) -> Dict[str, Any]:
+    """Respuesta de error para fallos inesperados al procesar un evento."""
+    return {
+        "status": "error",
+        "message": f"Processing error: {str(e)}",
+        "decision": "LOG_ONLY",
+        "score": 0.0,
+        "actions_executed": ["log_error"],
+        "reasoning": f"Unexpected error: {str(e)}"
+    }
 
 def get_decision_history(limit: int = 10) -> str:
     """
@@ -126,25 +288,21 @@ def get_decision_history(limit: int = 10) -> str:
     """
     try:
         if not decision_engine:
-            return json.dumps({
-                "status": "error",
-                "message": "Decision engine not initialized",
-                "history": []
-            })
+            return _ERR_HISTORY_NOT_INITIALIZED
         
         history = decision_engine.get_decision_history(limit)
         
         # Convertir a formato serializable
         history_data = [
             {
-                "decision": dr.decision.value,
-                "score": dr.score,
-                "actions_executed": dr.actions_executed,
-                "status": dr.status,
-                "reasoning": dr.reasoning,
-                "timestamp": dr.timestamp
+                "decision": decision.value,
+                "score": score,
+                "actions_executed": actions_executed,
+                "status": status,
+                "reasoning": reasoning,
+                "timestamp": timestamp
             }
-            for dr in history
+            for decision, score, actions_executed, status, reasoning, timestamp in map(_decision_fields, history)
         ]
         
         response = {
@@ -153,16 +311,16 @@ def get_decision_history(limit: int = 10) -> str:
             "history": history_data
         }
         
-        return json.dumps(response, indent=2)
+        return to_json(response)
         
     except Exception as e:
-        logger.error(f"Error getting decision history: {str(e)}")
+        logger.error("Error getting decision history: %s", e)
         error_response = {
             "status": "error",
             "message": f"Failed to get history: {str(e)}",
             "history": []
         }
-        return json.dumps(error_response, indent=2)
+        return to_json(error_response)
 
 def calculate_risk_score(event_data: str) -> str:
     """
@@ -176,31 +334,16 @@ def calculate_risk_score(event_data: str) -> str:
     """
     try:
         if not decision_engine:
-            return json.dumps({
-                "status": "error",
-                "message": "Decision engine not initialized",
-                "score": 0.0
-            })
+            return _ERR_SCORE_NOT_INITIALIZED
         
         # Parsear evento
-        event_dict = json.loads(event_data)
-        
-        # Crear objeto Event
-        from decision_engine import Severity, BusinessImpact
-        event = Event(
-            event_type=event_dict["event_type"],
-            severity=Severity(event_dict["severity"]),
-            resource=event_dict["resource"],
-            time_to_impact=float(event_dict["time_to_impact"]),
-            business_impact=BusinessImpact(event_dict["business_impact"]),
-            confidence=float(event_dict["confidence"])
-        )
+        event_dict = from_json(event_data)
         
-        # Calcular score
-        score = decision_engine.calculate_risk_score(event)
+        # Crear objeto Event con el mismo parser que el DecisionEngine
+        event = parse_event(event_dict)
         
-        # Obtener decisión esperada
-        decision = decision_engine.make_decision(event)
+        # Calcular score y obtener decisión esperada
+        decision, score = decision_engine.make_decision(event)
         
         # Desglose del cálculo
         breakdown = {
@@ -223,7 +366,7 @@ def calculate_risk_score(event_data: str) -> str:
             "event": event_dict
         }
         
-        return json.dumps(response, indent=2)
+        return to_json(response)
         
     except json.JSONDecodeError as e:
         error_response = {
@@ -231,7 +374,7 @@ def calculate_risk_score(event_data: str) -> str:
             "message": f"Invalid JSON format: {str(e)}",
             "score": 0.0
         }
-        return json.dumps(error_response, indent=2)
+        return to_json(error_response)
         
     except KeyError as e:
         error_response = {
@@ -239,16 +382,16 @@ def calculate_risk_score(event_data: str) -> str:
             "message": f"Missing required field: {str(e)}",
             "score": 0.0
         }
-        return json.dumps(error_response, indent=2)
+        return to_json(error_response)
         
     except Exception as e:
-        logger.error(f"Error calculating risk score: {str(e)}")
+        logger.error("Error calculating risk score: %s", e)
         error_response = {
             "status": "error",
             "message": f"Calculation error: {str(e)}",
             "score": 0.0
         }
-        return json.dumps(error_response, indent=2)
+        return to_json(error_response)
 
 def get_available_actions() -> str:
     """
@@ -259,11 +402,7 @@ def get_available_actions() -> str:
     """
     try:
         if not action_executor:
-            return json.dumps({
-                "status": "error",
-                "message": "Action executor not initialized",
-                "actions": []
-            })
+            return _ERR_ACTIONS_NOT_INITIALIZED
         
         actions = action_executor.get_available_actions()
         
@@ -273,16 +412,16 @@ def get_available_actions() -> str:
             "actions": actions
         }
         
-        return json.dumps(response, indent=2)
+        return to_json(response)
         
     except Exception as e:
-        logger.error(f"Error getting available actions: {str(e)}")
+        logger.error("Error getting available actions: %s", e)
         error_response = {
             "status": "error",
             "message": f"Failed to get actions: {str(e)}",
             "actions": []
         }
-        return json.dumps(error_response, indent=2)
+        return to_json(error_response)
 
 def get_decision_thresholds() -> str:
     """
@@ -293,33 +432,17 @@ def get_decision_thresholds() -> str:
     """
     try:
         if not decision_engine:
-            return json.dumps({
-                "status": "error",
-                "message": "Decision engine not initialized",
-                "thresholds": {}
-            })
-        
-        thresholds = {
-            "immediate_threshold": decision_engine.IMMEDIATE_THRESHOLD,
-            "alert_threshold": decision_engine.ALERT_THRESHOLD,
-            "confidence_threshold": decision_engine.CONFIDENCE_THRESHOLD,
-            "severity_weights": {k.value: v for k, v in decision_engine.SEVERITY_WEIGHTS.items()},
-            "impact_weights": {k.value: v for k, v in decision_engine.IMPACT_WEIGHTS.items()},
-            "urgency_weight": decision_engine.URGENCY_WEIGHT
-        }
-        
-        response = {
-            "status": "success",
-            "thresholds": thresholds
-        }
+            return _ERR_THRESHOLDS_NOT_INITIALIZED
         
-        return json.dumps(response, indent=2)
+        if _thresholds_json is None:
+            reload_thresholds()
+        return _thresholds_json
         
     except Exception as e:
-        logger.error(f"Error getting thresholds: {str(e)}")
+        logger.error("Error getting thresholds: %s", e)
         error_response = {
             "status": "error",
             "message": f"Failed to get thresholds: {str(e)}",
             "thresholds": {}
         }
-        return json.dumps(error_response, indent=2)
+        return to_json(error_response)
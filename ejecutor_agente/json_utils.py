@@ -0,0 +1,31 @@
+"""
+Serialización JSON compartida por los módulos del Executor Agent.
+Usa orjson cuando está instalado y la biblioteca estándar como respaldo.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional; se usa json de la stdlib como respaldo
+    orjson = None
+
+def to_json(obj: Any) -> str:
+    """
+    Serializar a JSON compacto (orjson si está disponible).
+    
+    Los valores no serializables se convierten con str().
+    
+    Args:
+        obj: Objeto a serializar
+        
+    Returns:
+        JSON string
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode()
+    return json.dumps(obj, separators=(",", ":"), default=str)
+
+# Parsear JSON desde str o bytes; orjson.JSONDecodeError hereda de json.JSONDecodeError
+from_json = orjson.loads if orjson is not None else json.loads
@@ -0,0 +1,65 @@
+"""
+Configuración de logging asíncrono para Executor Agent.
+Los registros se encolan en el hilo que los emite y se escriben desde un hilo dedicado.
+"""
+
+import atexit
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+_listener: Optional[QueueListener] = None
+
+def _stop_listener() -> None:
+    """
+    Detener el listener al terminar el proceso.
+    
+    atexit ejecuta los hooks en orden inverso al registro, por lo que el vaciado
+    de los sinks de action_system podría correr después de detener el listener
+    y sus logs (incluidos los fallos de envío) se perderían. Por eso los sinks
+    se vacían aquí antes de detenerlo, si el módulo está cargado.
+    """
+    action_system = sys.modules.get("action_system")
+    if action_system is not None:
+        action_system.flush_all_sinks()
+    if _listener is not None:
+        _listener.stop()
+
+def setup_queue_logging(level: int = logging.INFO,
+                        fmt: str = "[%(levelname)s]: %(message)s") -> QueueListener:
+    """
+    Configurar el logger raíz para enviar registros a través de una cola.
+    
+    El logger raíz solo recibe un QueueHandler (encolar es O(1) y no toma el
+    lock del handler real); un QueueListener en segundo plano formatea y
+    escribe los registros en stderr. Llamadas repetidas reutilizan el
+    listener existente.
+    
+    Args:
+        level: Nivel del logger raíz
+        fmt: Formato de los mensajes
+        
+    Returns:
+        Listener activo
+    """
+    global _listener
+    
+    root = logging.getLogger()
+    root.setLevel(level)
+    if _listener is not None:
+        return _listener
+    
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(fmt))
+    
+    log_queue: queue.Queue = queue.Queue(-1)
+    root.addHandler(QueueHandler(log_queue))
+    
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    
+    # Vaciar la cola antes de terminar el proceso
+    atexit.register(_stop_listener)
+    return _listener
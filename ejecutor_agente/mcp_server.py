@@ -4,21 +4,21 @@ Expone las herramientas de procesamiento de eventos y toma de decisiones.
 """
 
 import logging
-import json
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
 from mcp.server import Server
 from mcp.server.models import InitializationOptions
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
+from logging_setup import setup_queue_logging
+from action_system import flush_all_sinks
+from email_service import start_alert_workers, stop_alert_workers
 from executor_tools import process_event, get_decision_history, calculate_risk_score, get_available_actions, get_decision_thresholds
+from json_utils import to_json
 
 logger = logging.getLogger(__name__)
 
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="[%(levelname)s]: %(message)s"
-)
+# Configurar logging (escritura en segundo plano vía cola)
+setup_queue_logging(logging.INFO, "[%(levelname)s]: %(message)s")
 
 # Crear servidor MCP
 server = Server("executor-mcp-server")
@@ -92,6 +92,38 @@ async def list_tools() -> List[Tool]:
         )
     ]
 
+# Respuestas de error estáticas del servidor
+_ERR_EVENT_DATA_REQUIRED = to_json({
+    "status": "error",
+    "message": "event_data is required"
+})
+
+def _with_event_data(tool: Callable[[str], str]) -> Callable[[Dict[str, Any]], str]:
+    """
+    Adaptar una herramienta que recibe event_data como único argumento requerido.
+    
+    Args:
+        tool: Herramienta de executor_tools
+        
+    Returns:
+        Handler que valida los argumentos antes de invocar la herramienta
+    """
+    def handler(arguments: Dict[str, Any]) -> str:
+        event_data = arguments.get("event_data")
+        if not event_data:
+            return _ERR_EVENT_DATA_REQUIRED
+        return tool(event_data)
+    return handler
+
+# Handlers por nombre de herramienta; todos devuelven el JSON final ya serializado
+_TOOL_HANDLERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "process_event": _with_event_data(process_event),
+    "get_decision_history": lambda arguments: get_decision_history(arguments.get("limit", 10)),
+    "calculate_risk_score": _with_event_data(calculate_risk_score),
+    "get_available_actions": lambda arguments: get_available_actions(),
+    "get_decision_thresholds": lambda arguments: get_decision_thresholds()
+}
+
 @server.call_tool()
 async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
     """
@@ -100,54 +132,24 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
     try:
         logger.info(f"Tool called: {name} with arguments: {arguments}")
         
-        if name == "process_event":
-            event_data = arguments.get("event_data")
-            if not event_data:
-                return [TextContent(type="text", text=json.dumps({
-                    "status": "error",
-                    "message": "event_data is required"
-                }, indent=2))]
-            
-            result = process_event(event_data)
-            return [TextContent(type="text", text=result)]
-            
-        elif name == "get_decision_history":
-            limit = arguments.get("limit", 10)
-            result = get_decision_history(limit)
-            return [TextContent(type="text", text=result)]
-            
-        elif name == "calculate_risk_score":
-            event_data = arguments.get("event_data")
-            if not event_data:
-                return [TextContent(type="text", text=json.dumps({
-                    "status": "error",
-                    "message": "event_data is required"
-                }, indent=2))]
-            
-            result = calculate_risk_score(event_data)
-            return [TextContent(type="text", text=result)]
-            
-        elif name == "get_available_actions":
-            result = get_available_actions()
-            return [TextContent(type="text", text=result)]
-            
-        elif name == "get_decision_thresholds":
-            result = get_decision_thresholds()
-            return [TextContent(type="text", text=result)]
-            
-        else:
-            return [TextContent(type="text", text=json.dumps({
+        handler = _TOOL_HANDLERS.get(name)
+        if handler is None:
+            result = to_json({
                 "status": "error",
                 "message": f"Unknown tool: {name}"
-            }, indent=2))]
+            })
+        else:
+            result = handler(arguments)
             
     except Exception as e:
         logger.error(f"Error executing tool {name}: {str(e)}")
-        error_result = {
+        result = to_json({
             "status": "error",
             "message": f"Tool execution failed: {str(e)}"
-        }
-        return [TextContent(type="text", text=json.dumps(error_result, indent=2))]
+        })
+    
+    # Único punto donde se construye la respuesta MCP
+    return [TextContent(type="text", text=result)]
 
 async def main():
     """
@@ -155,20 +157,28 @@ async def main():
     """
     logger.info("🚀 Starting Executor MCP Server...")
     
-    # Ejecutar servidor con stdio
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="executor-mcp-server",
-                server_version="1.0.0",
-                capabilities=server.get_capabilities(
-                    notification_options=None,
-                    experimental_capabilities=None,
+    # Los correos de alerta se envían desde workers asíncronos, fuera de call_tool
+    start_alert_workers()
+    
+    try:
+        # Ejecutar servidor con stdio
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="executor-mcp-server",
+                    server_version="1.0.0",
+                    capabilities=server.get_capabilities(
+                        notification_options=None,
+                        experimental_capabilities=None,
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        # Entregar las alertas pendientes antes de cerrar
+        flush_all_sinks()
+        await stop_alert_workers()
 
 if __name__ == "__main__":
     import asyncio
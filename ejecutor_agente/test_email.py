@@ -4,11 +4,45 @@ Valida la configuración y envío de alertas por email.
 """
 
 import os
-import json
 import time
-from email_service import EmailService, EmailConfig
-from action_system import ActionExecutor, SendAlertAction
-from decision_engine import DecisionEngine, Severity, BusinessImpact
+import asyncio
+from functools import cache, lru_cache
+from typing import Optional
+from unittest import mock
+from email_service import EmailService, EmailResult, start_alert_workers, stop_alert_workers
+from action_system import ActionExecutor, ActionResult, SendAlertAction
+from decision_engine import DecisionEngine
+
+# Separadores de la salida
+_HR50 = "=" * 50
+_HR20 = "=" * 20
+
+@cache
+def _env(name: str) -> Optional[str]:
+    """Leer una variable de entorno una sola vez; usar _env.cache_clear() tras modificarlas."""
+    return os.getenv(name)
+
+@lru_cache(maxsize=None)
+def get_email_service() -> EmailService:
+    """Servicio de correo compartido por las pruebas para reutilizar sus conexiones SMTP."""
+    return EmailService()
+
+def _shared_email_service() -> Optional[EmailService]:
+    """Servicio compartido, o None si falta la configuración de correo."""
+    try:
+        return get_email_service()
+    except ValueError:
+        return None
+
+@cache
+def _engine() -> DecisionEngine:
+    """DecisionEngine compartido por las pruebas."""
+    return DecisionEngine()
+
+@cache
+def _executor() -> ActionExecutor:
+    """ActionExecutor compartido, con el servicio de correo compartido si está configurado."""
+    return ActionExecutor(_shared_email_service())
 
 def test_email_service_config():
     """Probar la configuración del servicio de correo."""
@@ -16,8 +50,8 @@ def test_email_service_config():
     
     try:
         # Verificar variables de entorno requeridas
-        required_vars = ["ALERT_EMAIL_FROM", "ALERT_EMAIL_PASSWORD"]
-        missing_vars = [var for var in required_vars if not os.getenv(var)]
+        required_vars = {"ALERT_EMAIL_FROM", "ALERT_EMAIL_PASSWORD"}
+        missing_vars = sorted(required_vars - os.environ.keys())
         
         if missing_vars:
             print(f"Missing environment variables: {missing_vars}")
@@ -27,14 +61,14 @@ def test_email_service_config():
             return False
         
         # Intentar inicializar el servicio
-        email_service = EmailService()
+        email_service = get_email_service()
         config = email_service.config
         
         print(f"Email service configured successfully:")
         print(f"  From: {config.email_from}")
         print(f"  SMTP: {config.smtp_server}:{config.smtp_port}")
         print(f"  TLS: {config.use_tls}")
-        print(f"  Recipients: {os.getenv('ALERT_EMAIL_RECIPIENTS', 'Not configured')}")
+        print(f"  Recipients: {_env('ALERT_EMAIL_RECIPIENTS') or 'Not configured'}")
         
         return True
         
@@ -47,7 +81,7 @@ def test_smtp_connection():
     print("\nTesting SMTP Connection...")
     
     try:
-        email_service = EmailService()
+        email_service = get_email_service()
         
         if email_service.test_connection():
             print("SMTP connection successful")
@@ -65,8 +99,8 @@ def test_send_alert_action():
     print("\nTesting SendAlert Action...")
     
     try:
-        # Crear acción de envío de alerta
-        send_alert_action = SendAlertAction()
+        # Crear acción de envío de alerta con el servicio compartido
+        send_alert_action = SendAlertAction(_shared_email_service())
         
         # Evento de prueba
         event = {
@@ -91,25 +125,36 @@ def test_send_alert_action():
             "decision": decision,
             "score": score,
             "actions_executed": actions_executed,
-            "reasoning": reasoning
+            "reasoning": reasoning,
+            "capture_details": True
         }
         
-        # Ejecutar acción
+        # Ejecutar acción y enviar de inmediato el lote pendiente
         result = send_alert_action.execute(context)
+        email_results = send_alert_action.flush()
         
         print(f"Action result: {result.result.value}")
         print(f"Message: {result.message}")
         
-        if result.result.value == "SUCCESS":
-            print("Alert email sent successfully")
-            if result.details and "recipients" in result.details:
-                print(f"  Recipients: {result.details['recipients']}")
-        else:
+        if result.result is not ActionResult.SUCCESS:
             print("Alert email failed")
             if result.details and "error" in result.details:
                 print(f"  Error: {result.details['error']}")
+            return False
         
-        return result.result.value == "SUCCESS"
+        # La acción solo encola; la entrega real se comprueba con el resultado del flush
+        delivered = bool(email_results) and all(email_result.success for email_result in email_results)
+        if delivered:
+            print("Alert email queued and delivered successfully")
+            if result.details and "recipients" in result.details:
+                print(f"  Recipients: {result.details['recipients']}")
+        else:
+            print("Alert email queued but delivery failed")
+            for email_result in email_results:
+                if not email_result.success:
+                    print(f"  Error: {email_result.message} ({email_result.error_details})")
+        
+        return delivered
         
     except Exception as e:
         print(f"SendAlert action test error: {str(e)}")
@@ -121,58 +166,69 @@ def test_full_integration():
     
     try:
         # Inicializar componentes
-        decision_engine = DecisionEngine()
-        action_executor = ActionExecutor()
-        
-        # Evento crítico de prueba
-        event = {
-            "event_type": "SECURITY_BREACH",
-            "severity": "HIGH",
-            "resource": "auth-server",
-            "time_to_impact": 1,
-            "business_impact": "CRITICAL",
-            "confidence": 0.98
-        }
-        
-        print(f"Processing event: {event['event_type']}")
-        
-        # Procesar evento
-        decision_result = decision_engine.process_event(event)
-        
-        print(f"Decision: {decision_result.decision.value}")
-        print(f"Score: {decision_result.score:.2f}")
-        print(f"Actions: {decision_result.actions_executed}")
-        
-        # Preparar contexto para acciones
-        action_context = {
-            "event": event,
-            "decision": decision_result.decision,
-            "score": decision_result.score,
-            "actions_executed": decision_result.actions_executed,
-            "reasoning": decision_result.reasoning
-        }
-        
-        # Ejecutar acciones
-        action_results = action_executor.execute_actions(
-            decision_result.actions_executed, 
-            action_context
-        )
-        
-        print("Action Results:")
-        email_sent = False
+        decision_engine = _engine()
+        action_executor = _executor()
+        
+        # Eventos críticos de prueba sobre varios recursos
+        events = [
+            {
+                "event_type": "SECURITY_BREACH",
+                "severity": "HIGH",
+                "resource": resource,
+                "time_to_impact": 1,
+                "business_impact": "CRITICAL",
+                "confidence": 0.98
+            }
+            for resource in ("auth-server", "auth-replica")
+        ]
+        
+        action_results = []
+        for event in events:
+            print(f"Processing event: {event['event_type']} on {event['resource']}")
+            
+            # Procesar evento
+            decision_result = decision_engine.process_event(event)
+            
+            print(f"Decision: {decision_result.decision.value}")
+            print(f"Score: {decision_result.score:.2f}")
+            print(f"Actions: {decision_result.actions_executed}")
+            
+            # Ejecutar acciones directamente desde el resultado de la decisión
+            action_results.extend(action_executor.execute_actions(
+                decision_result.actions_executed,
+                decision_result,
+                event
+            ))
+        
+        # Las alertas de todos los recursos salen en un solo lote por la misma sesión SMTP
+        email_results = action_executor.actions["send_alert"].flush()
+        action_executor.flush()
+        
+        lines = ["Action Results:"]
+        alert_queued = False
         for result in action_results:
-            status = "OK" if result.result.value == "SUCCESS" else "FAIL"
-            print(f"  {status} {result.action_name}: {result.message}")
+            succeeded = result.result is ActionResult.SUCCESS
+            lines.append(f"  {'OK' if succeeded else 'FAIL'} {result.action_name}: {result.message}")
             
-            if result.action_name == "send_alert" and result.result.value == "SUCCESS":
-                email_sent = True
+            if succeeded and result.action_name == "send_alert":
+                alert_queued = True
+        print("\n".join(lines))
         
-        if email_sent:
+        if not alert_queued:
+            print("Full integration test completed - email not sent (may be expected)")
+            return True
+        
+        # La acción solo encola; la entrega real se comprueba con el resultado del flush
+        delivered = bool(email_results) and all(email_result.success for email_result in email_results)
+        if delivered:
             print("Full integration test successful - email alert sent")
         else:
-            print("Full integration test completed - email not sent (may be expected)")
+            print("Full integration test failed - alert queued but delivery failed")
+            for email_result in email_results:
+                if not email_result.success:
+                    print(f"  Error: {email_result.message} ({email_result.error_details})")
         
-        return True
+        return delivered
         
     except Exception as e:
         print(f"Full integration test error: {str(e)}")
@@ -183,94 +239,162 @@ def test_email_without_config():
     print("\nTesting Behavior Without Email Configuration...")
     
     try:
-        # Temporalmente eliminar variables de entorno
-        original_email = os.getenv("ALERT_EMAIL_FROM")
-        original_password = os.getenv("ALERT_EMAIL_PASSWORD")
-        
-        if "ALERT_EMAIL_FROM" in os.environ:
-            del os.environ["ALERT_EMAIL_FROM"]
-        if "ALERT_EMAIL_PASSWORD" in os.environ:
-            del os.environ["ALERT_EMAIL_PASSWORD"]
-        
-        # Crear acción y ejecutar
-        send_alert_action = SendAlertAction()
-        
-        event = {"event_type": "TEST_EVENT"}
-        context = {"event": event}
-        
-        result = send_alert_action.execute(context)
+        # Eliminar temporalmente las credenciales; patch.dict restaura el entorno al salir
+        with mock.patch.dict(os.environ) as env:
+            env.pop("ALERT_EMAIL_FROM", None)
+            env.pop("ALERT_EMAIL_PASSWORD", None)
+            _env.cache_clear()
+            
+            # Crear acción y ejecutar
+            result = SendAlertAction().execute({"event": {"event_type": "TEST_EVENT"}})
+        _env.cache_clear()
         
         print(f"Result without config: {result.result.value}")
         print(f"Message: {result.message}")
         
-        if result.result.value == "FAILURE":
+        if result.result is ActionResult.FAILURE:
             print("Correctly handled missing configuration")
             success = True
         else:
             print("Should have failed with missing configuration")
             success = False
         
-        # Restaurar variables de entorno
-        if original_email:
-            os.environ["ALERT_EMAIL_FROM"] = original_email
-        if original_password:
-            os.environ["ALERT_EMAIL_PASSWORD"] = original_password
-        
         return success
         
     except Exception as e:
         print(f"FAIL Test without config error: {str(e)}")
         return False
 
-def main():
+def test_alerts_flushed_before_stop():
+    """Probar que las alertas vaciadas justo antes de detener los workers se entregan."""
+    print("\nTesting Alert Delivery On Worker Shutdown...")
+    
+    try:
+        # Servicio con credenciales ficticias; el envío se reemplaza, no se conecta a SMTP
+        with mock.patch.dict(os.environ, {
+            "ALERT_EMAIL_FROM": "shutdown-test@example.com",
+            "ALERT_EMAIL_PASSWORD": "unused",
+            "ALERT_DEDUP_TTL_SEC": "0"
+        }):
+            email_service = EmailService()
+        
+        delivered = []
+        
+        def send_alerts(alerts):
+            delivered.extend(alerts)
+            return [EmailResult(success=True, message="sent", recipients=to_emails, timestamp=time.time())
+                    for to_emails, _, _ in alerts]
+        
+        email_service.send_alerts = send_alerts
+        send_alert_action = SendAlertAction(email_service)
+        alert_count = 5
+        
+        async def run():
+            # Mismo orden que el cierre del servidor MCP: vaciar sinks y detener workers
+            start_alert_workers()
+            for i in range(alert_count):
+                send_alert_action.execute({
+                    "event": {"event_type": "SHUTDOWN_TEST", "resource": f"node-{i}"},
+                    "recipients": ["ops@example.com"]
+                })
+            send_alert_action.flush()
+            await stop_alert_workers()
+        
+        asyncio.run(run())
+        
+        print(f"Alerts delivered: {len(delivered)}/{alert_count}")
+        return len(delivered) == alert_count
+        
+    except Exception as e:
+        print(f"Shutdown delivery test error: {str(e)}")
+        return False
+
+async def _run_test(test_name: str, test_func) -> tuple:
+    """
+    Ejecutar una prueba bloqueante en un hilo para no bloquear el event loop.
+    
+    Args:
+        test_name: Nombre de la prueba
+        test_func: Función de prueba síncrona
+        
+    Returns:
+        Tupla (nombre, éxito)
+    """
+    try:
+        print(f"\n{_HR20} {test_name} {_HR20}")
+        return test_name, await asyncio.to_thread(test_func)
+    except Exception as e:
+        print(f"FAIL {test_name} test crashed: {str(e)}")
+        return test_name, False
+
+def _print_summary(results: list) -> None:
+    """
+    Imprimir el resumen de resultados.
+    
+    Args:
+        results: Tuplas (nombre, éxito) de cada prueba
+    """
+    print(f"\n{_HR50}")
+    print("Test Results Summary:")
+    passed = 0
+    for test_name, success in results:
+        status = "PASS" if success else "FAIL"
+        print(f"  {status} {test_name}")
+        if success:
+            passed += 1
+    
+    print(f"\nTotal: {passed}/{len(results)} tests passed")
+    
+    if passed == len(results):
+        print("\nAll tests passed!")
+    else:
+        print("Some tests failed - check configuration")
+
+async def main():
     """Ejecutar todas las pruebas del servicio de correo."""
     print("Executor Agent Email Service Test Suite")
-    print("=" * 50)
+    print(_HR50)
     
     # Verificar si hay configuración de correo
-    if not os.getenv("ALERT_EMAIL_FROM"):
+    if not _env("ALERT_EMAIL_FROM"):
         print("\nEmail configuration not found in .env file")
         print("To test email functionality, set these variables in .env:")
         print("  ALERT_EMAIL_FROM=your-email@gmail.com")
         print("  ALERT_EMAIL_PASSWORD=your-app-password")
         print("  ALERT_EMAIL_RECIPIENTS=admin@example.com")
         print("\nRunning basic functionality tests without email sending...")
+        
+        # Sin configuración las pruebas SMTP no pueden pasar; solo se validan las que no las usan
+        results = [
+            await _run_test("Missing Config", test_email_without_config),
+            await _run_test("Shutdown Delivery", test_alerts_flushed_before_stop)
+        ]
+        _print_summary(results)
+        return
     
+    # Pruebas limitadas por la latencia SMTP: se ejecutan en paralelo y
+    # comparten las conexiones autenticadas del pool del servicio
     tests = [
         ("Configuration", test_email_service_config),
         ("SMTP Connection", test_smtp_connection),
         ("SendAlert Action", test_send_alert_action),
-        ("Full Integration", test_full_integration),
-        ("Missing Config", test_email_without_config)
+        ("Full Integration", test_full_integration)
     ]
     
-    results = []
+    # Construir los componentes compartidos antes de lanzar los hilos
+    _executor()
     
-    for test_name, test_func in tests:
-        try:
-            print(f"\n{'='*20} {test_name} {'='*20}")
-            success = test_func()
-            results.append((test_name, success))
-        except Exception as e:
-            print(f"FAIL {test_name} test crashed: {str(e)}")
-            results.append((test_name, False))
+    results = list(await asyncio.gather(*[_run_test(name, func) for name, func in tests]))
     
-    # Resumen
-    print(f"\n{'='*50}")
-    print("Test Results Summary:")
-    passed = 0
-    for test_name, success in results:
-        status = "PASS" if success else "FAIL"
-        print(f"  {status} {test_name}")
-        if success:
-            passed += 1
+    # Modifican os.environ, por lo que se ejecutan solas tras las demás
+    results.append(await _run_test("Missing Config", test_email_without_config))
+    results.append(await _run_test("Shutdown Delivery", test_alerts_flushed_before_stop))
     
-    print(f"\nTotal: {passed}/{len(results)} tests passed")
+    _print_summary(results)
     
-    if passed == len(results):
-        print("\nAll tests passed!")
-    else:
-        print("Some tests failed - check configuration")
+    # Cerrar las conexiones SMTP del servicio compartido
+    if get_email_service.cache_info().currsize:
+        get_email_service().close()
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
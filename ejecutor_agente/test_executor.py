@@ -3,180 +3,282 @@ Script de prueba para Executor Agent.
 Valida el funcionamiento del motor de decisión y sistema de acciones.
 """
 
+import io
 import json
-import time
+import sys
 import asyncio
-import os
+from functools import cache
+from types import MappingProxyType
 from dotenv import load_dotenv
-from decision_engine import DecisionEngine, Event, Severity, BusinessImpact
-from action_system import ActionExecutor
-from executor_tools import initialize_tools, process_event, get_decision_history, calculate_risk_score
+from decision_engine import DecisionEngine
+from action_system import ActionExecutor, ActionResult
+from executor_tools import initialize_tools, process_event, process_event_obj_async, get_decision_history, calculate_risk_score
+from json_utils import to_json
 
-def test_decision_engine():
-    """Probar el motor de decisión con diferentes escenarios."""
-    print("Testing Decision Engine...")
-    
-    engine = DecisionEngine()
-    
-    # Casos de prueba
-    test_cases = [
-        {
-            "name": "Critical Event - High Confidence",
-            "event": {
-                "event_type": "SYSTEM_FAILURE",
-                "severity": "HIGH",
-                "resource": "database-primary",
-                "time_to_impact": 2,
-                "business_impact": "CRITICAL",
-                "confidence": 0.95
-            },
-            "expected_decision": "EXECUTE_IMMEDIATE"
+# Load environment variables from .env file (antes de construir los componentes)
+load_dotenv()
+
+# Separador de la salida
+_HR50 = "=" * 50
+
+@cache
+def _engine() -> DecisionEngine:
+    """DecisionEngine compartido por todas las pruebas."""
+    return DecisionEngine()
+
+@cache
+def _executor() -> ActionExecutor:
+    """ActionExecutor compartido por todas las pruebas."""
+    return ActionExecutor()
+
+@cache
+def _setup() -> None:
+    """Inicializar las herramientas con los componentes compartidos una sola vez."""
+    initialize_tools(_engine(), _executor())
+
+# Datos de prueba inmutables, construidos una sola vez al importar el módulo.
+# Los eventos y contextos siguen siendo dict porque el motor y el ejecutor
+# los exigen; las tuplas y MappingProxyType protegen el resto.
+_DECISION_TEST_CASES = (
+    MappingProxyType({
+        "name": "Critical Event - High Confidence",
+        "event": {
+            "event_type": "SYSTEM_FAILURE",
+            "severity": "HIGH",
+            "resource": "database-primary",
+            "time_to_impact": 2,
+            "business_impact": "CRITICAL",
+            "confidence": 0.95
         },
-        {
-            "name": "Medium Event - Medium Confidence",
-            "event": {
-                "event_type": "CPU_HIGH",
-                "severity": "MEDIUM",
-                "resource": "web-server-01",
-                "time_to_impact": 25,
-                "business_impact": "MEDIUM",
-                "confidence": 0.8
-            },
-            "expected_decision": "ALERT_AND_TICKET"
+        "expected_decision": "EXECUTE_IMMEDIATE"
+    }),
+    MappingProxyType({
+        "name": "Medium Event - Medium Confidence",
+        "event": {
+            "event_type": "CPU_HIGH",
+            "severity": "MEDIUM",
+            "resource": "web-server-01",
+            "time_to_impact": 25,
+            "business_impact": "MEDIUM",
+            "confidence": 0.8
+        },
+        "expected_decision": "ALERT_AND_TICKET"
+    }),
+    MappingProxyType({
+        "name": "Low Event - Low Confidence",
+        "event": {
+            "event_type": "MEMORY_WARNING",
+            "severity": "LOW",
+            "resource": "cache-server",
+            "time_to_impact": 180,
+            "business_impact": "LOW",
+            "confidence": 0.4
         },
-        {
-            "name": "Low Event - Low Confidence",
-            "event": {
-                "event_type": "MEMORY_WARNING",
-                "severity": "LOW",
-                "resource": "cache-server",
-                "time_to_impact": 180,
-                "business_impact": "LOW",
-                "confidence": 0.4
-            },
-            "expected_decision": "REQUIRES_HUMAN_REVIEW"
+        "expected_decision": "REQUIRES_HUMAN_REVIEW"
+    }),
+    MappingProxyType({
+        "name": "Low Priority Event",
+        "event": {
+            "event_type": "LOG_ROTATION",
+            "severity": "LOW",
+            "resource": "backup-server",
+            "time_to_impact": 300,
+            "business_impact": "LOW",
+            "confidence": 0.9
         },
-        {
-            "name": "Low Priority Event",
-            "event": {
-                "event_type": "LOG_ROTATION",
-                "severity": "LOW",
-                "resource": "backup-server",
-                "time_to_impact": 300,
-                "business_impact": "LOW",
-                "confidence": 0.9
-            },
-            "expected_decision": "LOG_ONLY"
-        }
+        "expected_decision": "LOG_ONLY"
+    })
+)
+
+_ACTION_CONTEXT = {
+    "event": {
+        "event_type": "SYSTEM_FAILURE",
+        "severity": "HIGH",
+        "resource": "database-primary",
+        "time_to_impact": 2,
+        "business_impact": "CRITICAL",
+        "confidence": 0.95
+    },
+    "decision": "EXECUTE_IMMEDIATE",
+    "score": 95.0,
+    "reasoning": "High risk event requires immediate action"
+}
+
+_ACTION_SETS = (
+    ("send_alert",),
+    ("create_ticket",),
+    ("execute_script",),
+    ("log_event",),
+    ("send_alert", "create_ticket", "execute_script"),
+    ("log_event", "flag_for_review")
+)
+
+_INTEGRATION_EVENTS = (
+    {
+        "event_type": "SECURITY_BREACH",
+        "severity": "HIGH",
+        "resource": "auth-server",
+        "time_to_impact": 1,
+        "business_impact": "CRITICAL",
+        "confidence": 0.98
+    },
+    {
+        "event_type": "DISK_SPACE_LOW",
+        "severity": "MEDIUM",
+        "resource": "file-server-02",
+        "time_to_impact": 45,
+        "business_impact": "MEDIUM",
+        "confidence": 0.85
+    },
+    {
+        "event_type": "SERVICE_DEGRADED",
+        "severity": "LOW",
+        "resource": "api-gateway",
+        "time_to_impact": 200,
+        "business_impact": "LOW",
+        "confidence": 0.6
+    }
+)
+
+_HISTORY_EVENTS = (
+    {
+        "event_type": "EVENT_1",
+        "severity": "HIGH",
+        "resource": "resource-1",
+        "time_to_impact": 5,
+        "business_impact": "CRITICAL",
+        "confidence": 0.9
+    },
+    {
+        "event_type": "EVENT_2",
+        "severity": "MEDIUM",
+        "resource": "resource-2",
+        "time_to_impact": 30,
+        "business_impact": "MEDIUM",
+        "confidence": 0.8
+    },
+    {
+        "event_type": "EVENT_3",
+        "severity": "LOW",
+        "resource": "resource-3",
+        "time_to_impact": 120,
+        "business_impact": "LOW",
+        "confidence": 0.7
+    }
+)
+_HISTORY_EVENT_JSON = tuple(to_json(event) for event in _HISTORY_EVENTS)
+
+_RISK_EVENT_JSON = to_json({
+    "event_type": "COMPLEX_EVENT",
+    "severity": "HIGH",
+    "resource": "critical-resource",
+    "time_to_impact": 10,
+    "business_impact": "CRITICAL",
+    "confidence": 0.85
+})
+
+_BATCH_EVENTS = (
+    {
+        "event_type": "SYSTEM_FAILURE",
+        "severity": "HIGH",
+        "resource": "database-primary",
+        "time_to_impact": 2,
+        "business_impact": "CRITICAL",
+        "confidence": 0.95
+    },
+    {
+        "event_type": "CPU_HIGH",
+        "severity": "MEDIUM",
+        "resource": "web-server-01",
+        "time_to_impact": 25,
+        "business_impact": "MEDIUM",
+        "confidence": 0.8
+    },
+    {
+        "event_type": "INVALID_EVENT",
+        "severity": "UNKNOWN",
+        "resource": "unknown",
+        "time_to_impact": 10,
+        "business_impact": "LOW",
+        "confidence": 0.9
+    }
+)
+
+def test_decision_engine():
+    """Probar el motor de decisión con diferentes escenarios."""
+    # Acumular la salida y escribirla de una vez al final de la prueba
+    out = io.StringIO()
+    print("Testing Decision Engine...", file=out)
+    
+    # El primer caso pasa por process_event y el resto en un solo lote, de modo
+    # que se prueban ambos caminos del motor
+    engine = _engine()
+    first_case, *other_cases = _DECISION_TEST_CASES
+    results = [
+        engine.process_event(first_case["event"]),
+        *engine.process_events([test_case["event"] for test_case in other_cases])
     ]
     
-    for i, test_case in enumerate(test_cases, 1):
-        print(f"\n--- Test Case {i}: {test_case['name']} ---")
-        
-        # Procesar evento
-        result = engine.process_event(test_case["event"])
+    for i, (test_case, result) in enumerate(zip(_DECISION_TEST_CASES, results), 1):
+        print(f"\n--- Test Case {i}: {test_case['name']} ---", file=out)
         
-        print(f"Event: {test_case['event']['event_type']}")
-        print(f"Decision: {result.decision.value}")
-        print(f"Score: {result.score:.2f}")
-        print(f"Actions: {result.actions_executed}")
-        print(f"Expected: {test_case['expected_decision']}")
+        print(f"Event: {test_case['event']['event_type']}", file=out)
+        print(f"Decision: {result.decision.value}", file=out)
+        print(f"Score: {result.score:.2f}", file=out)
+        print(f"Actions: {result.actions_executed}", file=out)
+        print(f"Expected: {test_case['expected_decision']}", file=out)
         
         # Validar resultado
         if result.decision.value == test_case["expected_decision"]:
-            print("PASS")
+            print("PASS", file=out)
         else:
-            print("FAIL")
+            print("FAIL", file=out)
         
-        print(f"Reasoning: {result.reasoning}")
+        print(f"Reasoning: {result.reasoning}", file=out)
+    
+    sys.stdout.write(out.getvalue())
 
 def test_action_system():
     """Probar el sistema de acciones."""
-    print("\nTesting Action System...")
+    out = io.StringIO()
+    print("\nTesting Action System...", file=out)
     
-    executor = ActionExecutor()
+    executor = _executor()
     
-    # Evento de prueba
-    event = {
-        "event_type": "SYSTEM_FAILURE",
-        "severity": "HIGH",
-        "resource": "database-primary",
-        "time_to_impact": 2,
-        "business_impact": "CRITICAL",
-        "confidence": 0.95
-    }
-    
-    # Contexto de prueba
-    context = {
-        "event": event,
-        "decision": "EXECUTE_IMMEDIATE",
-        "score": 95.0,
-        "reasoning": "High risk event requires immediate action"
-    }
+    for actions in _ACTION_SETS:
+        print(f"\n--- Testing actions: {list(actions)} ---", file=out)
+        results = executor.execute_actions(actions, _ACTION_CONTEXT)
+        
+        print("\n".join(
+            f"{'OK' if result.result is ActionResult.SUCCESS else 'ERROR'} {result.action_name}: {result.message}"
+            for result in results
+        ), file=out)
     
-    # Probar diferentes acciones
-    action_sets = [
-        ["send_alert"],
-        ["create_ticket"],
-        ["execute_script"],
-        ["log_event"],
-        ["send_alert", "create_ticket", "execute_script"],
-        ["log_event", "flag_for_review"]
-    ]
+    sys.stdout.write(out.getvalue())
+
+async def _process_concurrently(events) -> list:
+    """
+    Procesar eventos en paralelo con asyncio.gather, sin serializar a JSON.
     
-    for actions in action_sets:
-        print(f"\n--- Testing actions: {actions} ---")
-        results = executor.execute_actions(actions, context)
+    Args:
+        events: Eventos a procesar
         
-        for result in results:
-            status = "OK" if result.result.value == "SUCCESS" else "ERROR"
-            print(f"{status} {result.action_name}: {result.message}")
+    Returns:
+        Respuestas de cada evento, en el mismo orden
+    """
+    return await asyncio.gather(*(process_event_obj_async(event) for event in events))
 
 def test_integration():
     """Probar integración completa del sistema."""
     print("\nTesting Full Integration...")
+    _setup()
     
-    # Inicializar componentes
-    engine = DecisionEngine()
-    executor = ActionExecutor()
-    initialize_tools(engine, executor)
-    
-    # Eventos de prueba para integración
-    events = [
-        {
-            "event_type": "SECURITY_BREACH",
-            "severity": "HIGH",
-            "resource": "auth-server",
-            "time_to_impact": 1,
-            "business_impact": "CRITICAL",
-            "confidence": 0.98
-        },
-        {
-            "event_type": "DISK_SPACE_LOW",
-            "severity": "MEDIUM",
-            "resource": "file-server-02",
-            "time_to_impact": 45,
-            "business_impact": "MEDIUM",
-            "confidence": 0.85
-        },
-        {
-            "event_type": "SERVICE_DEGRADED",
-            "severity": "LOW",
-            "resource": "api-gateway",
-            "time_to_impact": 200,
-            "business_impact": "LOW",
-            "confidence": 0.6
-        }
-    ]
+    # Lanzar todos los eventos a la vez; sus acciones se solapan en el event loop
+    results = asyncio.run(_process_concurrently(_INTEGRATION_EVENTS))
     
-    for i, event in enumerate(events, 1):
+    for i, (event, result) in enumerate(zip(_INTEGRATION_EVENTS, results), 1):
         print(f"\n--- Integration Test {i}: {event['event_type']} ---")
         
-        # Procesar evento usando herramientas
-        event_json = json.dumps(event)
-        result_json = process_event(event_json)
-        result = json.loads(result_json)
-        
         print(f"Decision: {result['decision']}")
         print(f"Score: {result['score']:.2f}")
         print(f"Status: {result['status']}")
@@ -191,47 +293,14 @@ def test_integration():
 def test_decision_history():
     """Probar funcionalidad de historial de decisiones."""
     print("\nTesting Decision History...")
-    
-    # Inicializar componentes
-    engine = DecisionEngine()
-    executor = ActionExecutor()
-    initialize_tools(engine, executor)
+    _setup()
     
     # Procesar varios eventos
-    events = [
-        {
-            "event_type": "EVENT_1",
-            "severity": "HIGH",
-            "resource": "resource-1",
-            "time_to_impact": 5,
-            "business_impact": "CRITICAL",
-            "confidence": 0.9
-        },
-        {
-            "event_type": "EVENT_2",
-            "severity": "MEDIUM",
-            "resource": "resource-2",
-            "time_to_impact": 30,
-            "business_impact": "MEDIUM",
-            "confidence": 0.8
-        },
-        {
-            "event_type": "EVENT_3",
-            "severity": "LOW",
-            "resource": "resource-3",
-            "time_to_impact": 120,
-            "business_impact": "LOW",
-            "confidence": 0.7
-        }
-    ]
-    
-    # Procesar eventos
-    for event in events:
-        event_json = json.dumps(event)
+    for event_json in _HISTORY_EVENT_JSON:
         process_event(event_json)
     
-    # Obtener historial
-    history_json = get_decision_history(5)
+    # Obtener historial (solo los eventos de esta prueba; el motor es compartido)
+    history_json = get_decision_history(len(_HISTORY_EVENT_JSON))
     history = json.loads(history_json)
     
     print(f"History entries: {history['count']}")
@@ -241,25 +310,10 @@ def test_decision_history():
 def test_risk_calculation():
     """Probar cálculo de riesgo con desglose."""
     print("\nTesting Risk Calculation...")
-    
-    # Inicializar componentes
-    engine = DecisionEngine()
-    executor = ActionExecutor()
-    initialize_tools(engine, executor)
-    
-    # Evento de prueba
-    event = {
-        "event_type": "COMPLEX_EVENT",
-        "severity": "HIGH",
-        "resource": "critical-resource",
-        "time_to_impact": 10,
-        "business_impact": "CRITICAL",
-        "confidence": 0.85
-    }
+    _setup()
     
     # Calcular riesgo
-    event_json = json.dumps(event)
-    risk_json = calculate_risk_score(event_json)
+    risk_json = calculate_risk_score(_RISK_EVENT_JSON)
     risk_result = json.loads(risk_json)
     
     print(f"Full response: {json.dumps(risk_result, indent=2)}")
@@ -279,13 +333,28 @@ def test_risk_calculation():
     else:
         print("Breakdown: Not available in response")
 
+def test_batch_processing():
+    """Probar procesamiento por lotes contra el procesamiento individual."""
+    print("\nTesting Batch Processing...")
+    
+    # Motores propios: referencia independiente y sin duplicar el historial compartido
+    batch_results = DecisionEngine().process_events(list(_BATCH_EVENTS))
+    single_engine = DecisionEngine()
+    
+    for event, batch_result in zip(_BATCH_EVENTS, batch_results):
+        single_result = single_engine.process_event(event)
+        match = (
+            batch_result.decision == single_result.decision
+            and batch_result.score == single_result.score
+            and batch_result.status == single_result.status
+        )
+        print(f"{'PASS' if match else 'FAIL'} {event['event_type']}: "
+              f"{batch_result.decision.value} ({batch_result.score:.2f}, {batch_result.status})")
+
 def main():
     """Ejecutar todas las pruebas."""
-    # Load environment variables from .env file
-    load_dotenv()
-    
     print("Executor Agent Test Suite")
-    print("=" * 50)
+    print(_HR50)
     
     try:
         # Ejecutar pruebas
@@ -294,8 +363,9 @@ def main():
         test_integration()
         test_decision_history()
         test_risk_calculation()
+        test_batch_processing()
         
-        print("\n" + "=" * 50)
+        print("\n" + _HR50)
         print("All tests completed!")
         
     except Exception as e: